@@ -0,0 +1,64 @@
+"""compares 1k concurrent `AccountController.get("id", n)` lookups issued one
+statement each against the same lookups batched by the loader.
+
+    python -m benchmarks.batching
+"""
+import asyncio
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from benchmarks.utils import DB, report, setup_database, teardown_database, timer
+
+from core.accounts.controllers import AccountController
+from core.accounts.models import Account
+from core.database.instrumentation import query_stats
+
+ROWS = 10_000
+LOOKUPS = 1_000
+REPEAT = 10
+
+
+async def populate():
+    rows = [
+        {
+            "number": f"{i:010d}",
+            "amount": Decimal("0"),
+            "user_id": 1,
+            "account_type_id": 1,
+        }
+        for i in range(ROWS)
+    ]
+    for start in range(0, ROWS, 2_000):
+        await DB.execute(insert(Account).values(rows[start:start + 2_000]))
+
+
+async def lookups(batch_loads: bool):
+    ctrl = AccountController()
+    ctrl._cache = None  # measures the database, not the entity cache
+    ctrl.batch_loads = batch_loads
+    ids = range(1, ROWS + 1, ROWS // LOOKUPS)
+    return await asyncio.gather(*(ctrl.get("id", id) for id in ids))
+
+
+async def main():
+    await setup_database()
+    await populate()
+
+    for batch_loads in (False, True):
+        name = "batched" if batch_loads else "one per get"
+        samples = []
+        query_stats().clear()
+        for _ in range(REPEAT):
+            with timer(samples):
+                await lookups(batch_loads)
+
+        statements = sum(metric["count"] for metric in query_stats().stats().values())
+        report(f"{LOOKUPS} gets ({name})", samples)
+        print(f"{'':<40} {statements // REPEAT} statements per round")
+
+    await teardown_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""compares the latency of the page N using offset and keyset pagination.
+
+With offset the database scans and discards every earlier row, so the cost
+grows with N. With the keyset cursor it must stay flat.
+
+    python -m benchmarks.pagination
+"""
+import asyncio
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from benchmarks.utils import DB, report, setup_database, teardown_database, timer
+
+from core.transactions.controllers import TransactionController
+from core.transactions.models import Transaction, TransactionType
+
+ROWS = 200_000
+PAGE_SIZE = 100
+PAGES = (1, 100, 500, 1000, 1999)
+REPEAT = 5
+
+
+async def populate():
+    rows = [
+        {
+            "from_account_id": 1,
+            "to_account_id": 1,
+            "value": Decimal("1"),
+            "type": TransactionType.deposit,
+        }
+        for _ in range(10_000)
+    ]
+    for _ in range(ROWS // len(rows)):
+        await DB.execute(insert(Transaction).values(rows))
+
+
+async def main():
+    await setup_database()
+    await populate()
+    ctrl = TransactionController()
+
+    cursors = {}
+    cursor = None
+    for number in range(1, max(PAGES) + 1):
+        if number in PAGES:
+            cursors[number] = cursor
+        cursor = (await ctrl.page(cursor, PAGE_SIZE)).next_cursor
+
+    for number in PAGES:
+        offset_samples, keyset_samples = [], []
+        for _ in range(REPEAT):
+            with timer(offset_samples):
+                await ctrl.all(PAGE_SIZE, (number - 1) * PAGE_SIZE)
+            with timer(keyset_samples):
+                await ctrl.page(cursors[number], PAGE_SIZE)
+
+        report(f"page {number} (offset)", offset_samples)
+        report(f"page {number} (keyset)", keyset_samples)
+
+    await teardown_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,67 @@
+"""compares fetching full `user` rows against fetching only the columns
+that the ownership checks and the authentication need.
+
+    python -m benchmarks.projection
+"""
+import asyncio
+from datetime import date
+
+from sqlalchemy import insert
+
+from benchmarks.utils import DB, report, setup_database, teardown_database, timer
+
+from core.users.controllers import UserController
+from core.users.models import User
+
+ROWS = 20_000
+REPEAT = 20
+LOOKUPS = 1_000
+
+
+async def populate():
+    rows = [
+        {
+            "username": f"user{i}",
+            "password": "x" * 256,
+            "first_name": "f" * 40,
+            "last_name": "l" * 40,
+            "cpf": f"{i:011d}",
+            "birthdate": date(2000, 1, 1),
+        }
+        for i in range(ROWS)
+    ]
+    for start in range(0, ROWS, 2_000):
+        await DB.execute(insert(User).values(rows[start:start + 2_000]))
+
+
+async def main():
+    await setup_database()
+    await populate()
+    ctrl = UserController()
+    ctrl._cache = None  # measures the database, not the entity cache
+
+    full, projected = [], []
+    for _ in range(REPEAT):
+        with timer(full):
+            await ctrl.all(ROWS)
+        with timer(projected):
+            await ctrl.all(ROWS, columns=["id", "username"])
+    report(f"all {ROWS} rows (full)", full)
+    report(f"all {ROWS} rows (id, username)", projected)
+
+    full, projected = [], []
+    for _ in range(REPEAT):
+        with timer(full):
+            for id in range(1, LOOKUPS + 1):
+                await ctrl.get("id", id)
+        with timer(projected):
+            for id in range(1, LOOKUPS + 1):
+                await ctrl.get("id", id, columns=["username"])
+    report(f"{LOOKUPS} gets (full)", full)
+    report(f"{LOOKUPS} gets (username)", projected)
+
+    await teardown_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""shared helpers of the benchmark scripts.
+
+The benchmarks run against a throwaway SQLite file, so this module must be
+imported before any `core` module to point the settings to it.
+"""
+import os
+import time
+from contextlib import contextmanager
+from statistics import median
+from typing import Iterator, List
+
+BENCH_DB_FILE = "bench.db"
+
+os.environ["DATABASE_URI"] = f"sqlite+aiosqlite:///{BENCH_DB_FILE}"
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("JWT_SECRET", "benchmark")
+# the measured statements are slow on purpose, keeps the slow query log quiet
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "inf")
+
+from core.database.conf import DB, Base, engine  # noqa: E402
+from core.users.models import User  # noqa: F401, E402
+from core.accounts.models import AccountType, Account  # noqa: F401, E402
+from core.transactions.models import Transaction  # noqa: F401, E402
+from core.auth.models import Role, UserRole  # noqa: F401, E402
+from core.idempotency.models import IdempotencyKey  # noqa: F401, E402
+from core.ledger.models import BalanceCheckpoint, Posting  # noqa: F401, E402
+
+
+async def setup_database():
+    """drops the old benchmark database, creates all tables and connect"""
+    if os.path.exists(BENCH_DB_FILE):
+        os.remove(BENCH_DB_FILE)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await DB.connect()
+
+
+async def teardown_database():
+    """disconnect and remove the benchmark database file"""
+    await DB.disconnect()
+    await engine.dispose()
+    if os.path.exists(BENCH_DB_FILE):
+        os.remove(BENCH_DB_FILE)
+
+
+@contextmanager
+def timer(samples: List[float]) -> Iterator[None]:
+    """appends the elapsed time in milliseconds of the block to `samples`"""
+    start = time.perf_counter()
+    yield
+    samples.append((time.perf_counter() - start) * 1000)
+
+
+def report(name: str, samples: List[float]):
+    """prints the median and the max of the samples"""
+    print(f"{name:<40} median {median(samples):8.3f} ms   max {max(samples):8.3f} ms")
@@ -1,12 +1,44 @@
+from typing import AsyncContextManager, Sequence
+
+from sqlalchemy import select
+
 from core.database.controller import DatabaseController
+from core.database.locks import lock_manager
+from core.ledger.models import account_balance
 from .models import Account, AccountType
 
 
 class AccountController(DatabaseController):
     """controller to manage the account database model"""
 
+    cache_enabled = True
+    batch_loads = True
+
     def __init__(self) -> None:
         super().__init__(model=Account)
+        self.locks = lock_manager(Account.__tablename__)
+
+    def lock(self, *ids: int) -> AsyncContextManager[None]:
+        """returns a context manager that holds the in-process locks of the
+        accounts, acquired in id order. Operations that change the amount of
+        an account must run inside it, so they don't interleave on the same
+        account.
+
+        Args:
+            ids (int): the ids of the accounts.
+        """
+        return self.locks.acquire(*ids)
+
+    def _select(self, columns: Sequence[str] | None = None):
+        """selects the `amount` as the balance derived from the ledger, the
+        last checkpoint of the account plus the postings after it"""
+        fields = columns or [column.name for column in Account.__table__.columns]
+        return select(
+            *(
+                account_balance().label(field) if field == "amount" else getattr(Account, field)
+                for field in fields
+            )
+        )
 
 
 class AccountTypeController(DatabaseController):
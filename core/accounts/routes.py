@@ -1,12 +1,11 @@
 from http import HTTPStatus
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
-
 from core.auth.controllers import JWTController
 from core.exceptions import JWTException
+from core.streaming import StreamFormat, stream_records
 from core.users.controllers import UserController
 
 from . import schemas
@@ -47,14 +46,13 @@ async def create_account_type(
     jwt_ctrl.validate_token(credentials, required_roles="admin")
 
     data = acc_type_data.model_dump()
-    if await ctrl.get("type", acc_type_data.type):
+    if await ctrl.exists(type=acc_type_data.type):
         raise HTTPException(
             status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
             detail="account type already exists.",
         )
 
-    await ctrl.create(**data)
-    created = await ctrl.get("type", acc_type_data.type)
+    created = await ctrl.create(returning=True, **data)
     return created
 
 
@@ -65,23 +63,32 @@ async def create_account_type(
     description="Lista todas os tipos de conta presentes no banco de dados.",
 )
 async def list_account_types(
+    response: Response,
     limit: int = 100,
     offset: int = 0,
+    after: str | None = None,
     ctrl: AccountTypeController = Depends(AccountTypeController),
 ):
     """list all account types available. Is not necessary to be authenticated.
+    The cursor to the next page is sent in the `X-Next-Cursor` header and the
+    approximate total in `X-Total-Count`.
 
     Args:
+        response (Response): the response, used to set the pagination headers.
         limit (int, optional): the limit of account types to show. Defaults to 100.
-        offset (int, optional): the offset to apply. Defaults to 0.
+        offset (int, optional): the offset to apply when no cursor is sent. Defaults to 0.
+        after (str | None, optional): the cursor of the next page. Defaults to None.
         ctrl (AccountTypeController, optional): the instance of the account type controller. Defaults to Depends(AccountTypeController).
 
     Returns:
         List[AccountTypeOutSchema]: the list of account types.
     """
-    stmt = select(ctrl.model).limit(limit).offset(offset)
-    account_types = await ctrl.query(stmt)
-    return account_types
+    page = await ctrl.page(after, limit, offset=offset)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    total = await ctrl.count(approximate=True)
+    response.headers["X-Total-Count"] = str(total)
+    return page.records
 
 
 @router.post(
@@ -118,7 +125,7 @@ async def create_account(
         AccountOutSchema: the account created.
     """
     data = account_data.model_dump()
-    user = await user_ctrl.get("id", account_data.user_id)
+    user = await user_ctrl.get("id", account_data.user_id, columns=["username"])
     if not user:
         raise HTTPException(
             status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail="invalid user id"
@@ -131,22 +138,19 @@ async def create_account(
             detail="You can only to create an account to yourself.",
         )
 
-    acc_type = await account_type_ctrl.get("id", account_data.account_type_id)
-    if not acc_type:
+    if not await account_type_ctrl.exists(id=account_data.account_type_id):
         raise HTTPException(
             status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
             detail="invalid account type id",
         )
 
-    number_exists = await account_ctrl.get("number", account_data.number)
-    if number_exists:
+    if await account_ctrl.exists(number=account_data.number):
         raise HTTPException(
             status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
             detail="account number already exists.",
         )
 
-    await account_ctrl.create(**data)
-    account = await account_ctrl.get("number", account_data.number)
+    account = await account_ctrl.create(returning=True, **data)
     return account
 
 
@@ -185,7 +189,7 @@ async def get_account(
             status_code=HTTPStatus.NOT_FOUND, detail="account not found"
         )
 
-    user = await usr_ctrl.get("id", account._mapping["user_id"])
+    user = await usr_ctrl.get("id", account._mapping["user_id"], columns=["username"])
     username = jwt_ctrl.validate_token(credentials)
     if username != user._mapping["username"]:  # type: ignore
         try:
@@ -206,16 +210,25 @@ async def get_account(
 )
 async def list_accounts(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer)],
+    response: Response,
     limit: int = 100,
     offset: int = 0,
+    after: str | None = None,
+    stream: StreamFormat | None = None,
     ctrl: AccountController = Depends(AccountController),
 ):
     """list all accounts. Only users with `admin` role can have access.
+    The cursor to the next page is sent in the `X-Next-Cursor` header and the
+    approximate total in `X-Total-Count`. If `stream` is sent all the accounts
+    are streamed from the database cursor, without paging.
 
     Args:
         credentials (Annotated[HTTPAuthorizationCredentials, Depends): authorization header value
+        response (Response): the response, used to set the pagination headers.
         limit (int, optional): the limit of account. Defaults to 100.
-        offset (int, optional): the offset to apply on list. Defaults to 0.
+        offset (int, optional): the offset to apply on list when no cursor is sent. Defaults to 0.
+        after (str | None, optional): the cursor of the next page. Defaults to None.
+        stream (StreamFormat | None, optional): `json` or `ndjson` to stream all the accounts. Defaults to None.
         ctrl (AccountController, optional): the accounts controller. Defaults to Depends(AccountController).
 
     Returns:
@@ -223,6 +236,12 @@ async def list_accounts(
     """
     jwt_ctrl.validate_token(credentials, required_roles="admin")
 
-    stmt = select(ctrl.model).limit(limit).offset(offset)
-    accounts = await ctrl.query(stmt)
-    return accounts
+    if stream is not None:
+        return stream_records(ctrl.iter_all(), schemas.AccountOutSchema, stream)
+
+    page = await ctrl.page(after, limit, offset=offset)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    total = await ctrl.count(approximate=True)
+    response.headers["X-Total-Count"] = str(total)
+    return page.records
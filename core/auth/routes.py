@@ -1,9 +1,9 @@
 from http import HTTPStatus
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import and_, select
+from sqlalchemy import select
 
 from core.users.controllers import UserController
 
@@ -61,7 +61,9 @@ async def authenticate(
         status_code=HTTPStatus.UNAUTHORIZED, detail="Invalid credentials."
     )
 
-    user = await usr_ctrl.get("username", auth_data.username)
+    user = await usr_ctrl.get(
+        "username", auth_data.username, columns=["id", "username", "password"]
+    )
     if user is None:
         raise base_exc
 
@@ -69,10 +71,10 @@ async def authenticate(
     if not chk:
         raise base_exc
 
-    stmt = select(usr_role_ctrl.model.role_id).where(
-        usr_role_ctrl.model.user_id == user._mapping["id"]
+    user_roles = await usr_role_ctrl.filter_by(
+        columns=["role_id"], user_id=user._mapping["id"]
     )
-    user_role_ids = [r.role_id for r in await usr_role_ctrl.query(stmt)]  # type: ignore
+    user_role_ids = [r.role_id for r in user_roles]  # type: ignore
 
     stmt = select(role_ctrl.model.name).where(role_ctrl.model.id.in_(user_role_ids))
     role_names = [r.name for r in await role_ctrl.query(stmt)]  # type: ignore
@@ -90,22 +92,31 @@ async def authenticate(
     description="Retorna todas as roles do banco de dados."
 )
 async def list_roles(
+    response: Response,
     limit: int = RoleController.DEFAULT_LIMIT,
     offset: int = RoleController.DEFAULT_OFFSET,
+    after: str | None = None,
     ctrl: RoleController = Depends(RoleController),
 ):
-    """list all roles.
+    """list all roles. The cursor to the next page is sent in the `X-Next-Cursor` header
+    and the approximate total in `X-Total-Count`.
 
     Args:
+        response (Response): the response, used to set the pagination headers.
         limit (int, optional): the limit of roles. Defaults to RoleController.DEFAULT_LIMIT.
-        offset (int, optional): the offset to apply. Defaults to RoleController.DEFAULT_OFFSET.
+        offset (int, optional): the offset to apply when no cursor is sent. Defaults to RoleController.DEFAULT_OFFSET.
+        after (str | None, optional): the cursor of the next page. Defaults to None.
         ctrl (RoleController, optional): the role controller. Defaults to Depends(RoleController).
 
     Returns:
         List[RoleOutSchema]: the list of roles from database
     """
-    roles = await ctrl.all(limit, offset)
-    return roles
+    page = await ctrl.page(after, limit, offset=offset)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    total = await ctrl.count(approximate=True)
+    response.headers["X-Total-Count"] = str(total)
+    return page.records
 
 
 @router.post(
@@ -132,7 +143,7 @@ async def create_role(
     """
     jwt_ctrl.validate_token(credentials, required_roles="admin")
 
-    if await ctrl.get("name", role_data.name):
+    if await ctrl.exists(name=role_data.name):
         raise HTTPException(
             status_code=HTTPStatus.UNPROCESSABLE_ENTITY, detail="Role already exists."
         )
@@ -162,13 +173,7 @@ async def add_user_role(
         HTTPException: the user already have the role.
     """
     jwt_ctrl.validate_token(credentials, required_roles="admin")
-    stmt = select(ctrl.model).where(
-        and_(
-            ctrl.model.user_id == role_data.user_id,
-            ctrl.model.role_id == role_data.role_id,
-        )
-    )
-    if await ctrl.query(stmt):
+    if await ctrl.exists(user_id=role_data.user_id, role_id=role_data.role_id):
         raise HTTPException(
             status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
             detail="The user already have this role.",
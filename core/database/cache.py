@@ -0,0 +1,154 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Set, Tuple
+
+from core.settings import settings
+
+
+class TTLCache:
+    """bounded LRU cache whose entries expire after `ttl` seconds. Keeps
+    hit, miss and eviction counters.
+
+    Args:
+        maxsize (int): the max number of entries, the least recently used is evicted.
+        ttl (float): the seconds that an entry lives.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """returns the value of the key or `default` if missing or expired"""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """stores the value evicting the least recently used entries if full"""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def pop(self, key: Hashable):
+        """removes the key if it exists"""
+        if key in self._data:
+            self._remove(key)
+
+    def clear(self):
+        """removes all the entries"""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """returns the cache counters"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable):
+        """removes an entry, subclasses can hook it to clean their indexes"""
+        del self._data[key]
+
+
+class EntityCache(TTLCache):
+    """read-through cache of the registries of one model keyed by
+    (model, field, value). Keeps an index of the keys of each registry id,
+    so a write on the id drops every key that points to it.
+
+    Args:
+        table (str): the model table name.
+        maxsize (int): the max number of cached registries.
+        ttl (float): the seconds that a registry lives in the cache.
+    """
+
+    def __init__(self, table: str, maxsize: int, ttl: float) -> None:
+        super().__init__(maxsize, ttl)
+        self.table = table
+        self._keys_by_id: Dict[Any, Set[Hashable]] = {}
+
+    def get_record(self, field: str, value: Any) -> Any:
+        """returns the cached registry where `field` equals to `value`"""
+        return self.get((self.table, field, value))
+
+    def set_record(self, field: str, value: Any, record: Any):
+        """caches the registry found by `field` equals to `value`"""
+        key = (self.table, field, value)
+        self.set(key, record)
+        id = record_id(record)
+        if key in self._data:
+            self._keys_by_id.setdefault(id, set()).add(key)
+
+    def invalidate(self, id: Any):
+        """drops all the cached keys of the registry with the given id"""
+        for key in self._keys_by_id.pop(id, set()):
+            self.pop(key)
+
+    def clear(self):
+        super().clear()
+        self._keys_by_id.clear()
+
+    def _remove(self, key: Hashable):
+        _, record = self._data.pop(key)
+        id = record_id(record)
+        keys = self._keys_by_id.get(id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_id[id]
+
+
+_ENTITY_CACHES: Dict[str, EntityCache] = {}
+_COUNT_CACHE = TTLCache(settings.ENTITY_CACHE_MAXSIZE, settings.COUNT_CACHE_TTL)
+
+
+def record_id(record: Any) -> Any:
+    """returns the `id` of the registry or None if the model has no id"""
+    if record is None or "id" not in record.keys():
+        return None
+    return record["id"]
+
+
+def entity_cache(table: str) -> EntityCache:
+    """returns the entity cache of the table, creating it with the sizes
+    configured in the settings"""
+    if table not in _ENTITY_CACHES:
+        _ENTITY_CACHES[table] = EntityCache(
+            table, settings.ENTITY_CACHE_MAXSIZE, settings.ENTITY_CACHE_TTL
+        )
+    return _ENTITY_CACHES[table]
+
+
+def entity_caches() -> Dict[str, EntityCache]:
+    """returns all the entity caches created by table name"""
+    return _ENTITY_CACHES
+
+
+def count_cache() -> TTLCache:
+    """returns the cache of the approximate counts keyed by the count statement"""
+    return _COUNT_CACHE
@@ -1,61 +1,149 @@
+import base64
+import binascii
+import json
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from http import HTTPStatus
-from typing import List, Any, Mapping, Sequence
+from typing import AsyncIterator, List, Any, Mapping, NamedTuple, Sequence, Set, Tuple
 
 from databases.interfaces import Record
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import select, insert, update, delete, func, literal, tuple_
 
 from sqlalchemy.exc import SQLAlchemyError
 
-from core.exceptions import DatabaseException
+from core.exceptions import (
+    BulkValidationException,
+    DatabaseException,
+    ValidationException,
+)
+from .cache import count_cache, entity_cache, entity_caches, record_id
 from .conf import DB
+from .identity import current_identity_map
+from .instrumentation import InstrumentedDatabase
+from .loader import batch_loader
+
+logger = logging.getLogger(__name__)
+
+# ids written by the current task inside `DatabaseController.transaction()`,
+# invalidated again once the transaction ends.
+_pending_invalidations: ContextVar[Set[Tuple[str, Any]] | None] = ContextVar(
+    "pending_invalidations", default=None
+)
+
+class Page(NamedTuple):
+    """a page of registries returned by the keyset pagination
+
+    Args:
+        records (List[Record]): the registries of the page.
+        next_cursor (str | None): opaque cursor to the next page, None if this is the last one.
+    """
+    records: List[Record]
+    next_cursor: str | None
 
 
 class DatabaseController:
-    """controller to manager the database operations"""
+    """controller to manager the database operations. Subclasses set
+    `cache_enabled` to read `get` results through the model entity cache and
+    `batch_loads` to batch the concurrent `get` calls by an unique field.
+    Every statement is measured through `InstrumentedDatabase`."""
+
+    cache_enabled = False
+    batch_loads = False
 
     DEFAULT_LIMIT = 1000
     DEFAULT_OFFSET = 0
+    DEFAULT_CHUNK_SIZE = 500
+    SQLITE_MAX_VARIABLES = 32766  # default limit of bound parameters since SQLite 3.32
 
     def __init__(self, model: Any = None, db=DB) -> None:  # type: ignore
         self._model = model
-        self._db = db
+        self._db = InstrumentedDatabase(db)
         if self._model is None:
             raise AttributeError("the `model` argument must be expecified.")
 
+        self._cache = (
+            entity_cache(self._model.__tablename__) if self.cache_enabled else None
+        )
+
     @property
     def model(self):
         return self._model
 
-    async def get(self, where_field: str, equals_to: Any) -> Record | None:
-        """return a registry where the `where_field` value matches with `equals_to` value
+    async def get(
+        self,
+        where_field: str,
+        equals_to: Any,
+        columns: Sequence[str] | None = None,
+    ) -> Record | None:
+        """return a registry where the `where_field` value matches with `equals_to` value.
+        The registries already loaded by the current request are returned from its
+        identity map, and if the cache is enabled the registry is read through it.
+        With `batch_loads` the lookups by an unique field are batched with the
+        concurrent ones. Inside transactions it always reads from the database.
 
         Args:
             where_field (str): the of the field to use on the where clause
             equals_to (Any): the expected matching value to the where field
+            columns (Sequence[str] | None, optional): the only fields to fetch. A cached
+            full registry is still returned if there is one. Defaults to None.
 
         Returns:
             Record: the model registry found
         """
-        self._check_fields([where_field])
+        self._check_fields([where_field, *(columns or [])])
+        table = self._model.__tablename__
+        in_transaction = self._in_transaction()
+        identities = None if in_transaction else current_identity_map()
+        if identities is not None:
+            loaded = identities.get(table, where_field, equals_to)
+            if loaded is not None:
+                return loaded
+
+        use_cache = self._cache is not None and not in_transaction
+        if use_cache:
+            cached = self._cache.get_record(where_field, equals_to)  # type: ignore
+            if cached is not None:
+                if identities is not None:
+                    identities.add(table, where_field, equals_to, cached)
+                return cached
+
         try:
             field = getattr(self._model, where_field)
-            stmt = select(self._model).where(field == equals_to)
-            user = await self._db.fetch_one(stmt)
-            return user
+            column = self._model.__table__.columns[where_field]
+            if self.batch_loads and not columns and not in_transaction and (
+                column.primary_key or column.unique
+            ):
+                loader = batch_loader(self._db, self._model, where_field, self._select())
+                user = await loader.load(equals_to)
+            else:
+                stmt = self._select(columns).where(field == equals_to)
+                user = await self._db.fetch_one(stmt)
 
         except SQLAlchemyError as exc:
             raise DatabaseException(
                 f"Unexpected fail fetching `{self._model.__tablename__}`"  # type: ignore
             ) from exc
 
+        if user is not None and not columns:
+            if identities is not None:
+                identities.add(table, where_field, equals_to, user)
+            if use_cache:
+                self._cache.set_record(where_field, equals_to, user)  # type: ignore
+        return user
+
     async def all(
-        self, limit: int = DEFAULT_LIMIT, offset: int = DEFAULT_OFFSET
+        self,
+        limit: int = DEFAULT_LIMIT,
+        offset: int = DEFAULT_OFFSET,
+        columns: Sequence[str] | None = None,
     ) -> List[Record]:
         """return all model data from database
 
         Args:
             limit (int, optional): the limit of registries. Defaults to 1000.
             offset (int, optional): the offset to apply on the result. Defaults to 0.
+            columns (Sequence[str] | None, optional): the only fields to fetch. Defaults to None.
 
         Returns:
             List[Record]: a list with all data found.
@@ -65,22 +153,166 @@ class DatabaseController:
         if not isinstance(offset, int):
             offset = self.DEFAULT_OFFSET
 
+        self._check_fields(columns or [])
         try:
-            stmt = select(self._model).offset(offset).limit(limit)
+            stmt = self._select(columns).offset(offset).limit(limit)
             users = await self._db.fetch_all(stmt)
             return users
 
         except SQLAlchemyError as exc:
-            print(str(exc))
+            logger.error("`%s` statement failed: %s", self._model.__tablename__, exc)
+            raise DatabaseException(
+                "Error fetching data.",
+            ) from exc
+
+    async def filter_by(
+        self,
+        *where: Any,
+        columns: Sequence[str] | None = None,
+        limit: int = DEFAULT_LIMIT,
+        **criteria: Any,
+    ) -> List[Record]:
+        """return the registries matching the where clauses and where every field
+        equals to the given value
+
+        Args:
+            where (Any): the where clauses to apply.
+            columns (Sequence[str] | None, optional): the only fields to fetch. Defaults to None.
+            limit (int, optional): the limit of registries. Defaults to 1000.
+            criteria (Any): the field names and the values they must be equal to.
+
+        Returns:
+            List[Record]: the registries found.
+        """
+        self._check_fields(columns or [])
+        try:
+            stmt = self._select(columns).where(*where, *self._criteria(criteria))
+            stmt = stmt.limit(limit)
+            return await self._db.fetch_all(stmt)
+
+        except SQLAlchemyError as exc:
+            logger.error("`%s` statement failed: %s", self._model.__tablename__, exc)
+            raise DatabaseException(
+                "Error fetching data.",
+            ) from exc
+
+    async def page(
+        self,
+        after: str | None = None,
+        limit: int = DEFAULT_LIMIT,
+        *,
+        order_by: Sequence[str] = ("id",),
+        where: Any = None,
+        offset: int = DEFAULT_OFFSET,
+    ) -> Page:
+        """return a page of registries using keyset (cursor) pagination. Instead of
+        skipping `offset` rows, the query seeks straight to the rows after the
+        cursor, so deep pages cost the same as the first one.
+
+        Args:
+            after (str | None, optional): the cursor returned by the previous page. Defaults to None.
+            limit (int, optional): the max number of registries in the page. Defaults to 1000.
+            order_by (Sequence[str], optional): the unique ordering key fields. Defaults to ("id",).
+            where (Any, optional): an extra where clause to filter the registries. Defaults to None.
+            offset (int, optional): offset applied only when no cursor is sent, kept for
+            clients that still page by offset. Defaults to 0.
+
+        Raises:
+            DatabaseException: the cursor is invalid or some database error occur.
+
+        Returns:
+            Page: the registries found and the cursor to the next page.
+        """
+        if not isinstance(limit, int):
+            limit = self.DEFAULT_LIMIT
+        if not isinstance(offset, int):
+            offset = self.DEFAULT_OFFSET
+
+        self._check_fields(order_by)
+        columns = [getattr(self._model, field) for field in order_by]
+        stmt = self._select().order_by(*columns).limit(limit + 1)
+        if where is not None:
+            stmt = stmt.where(where)
+
+        if after:
+            values = self._decode_cursor(after, len(columns))
+            if len(columns) == 1:
+                stmt = stmt.where(columns[0] > literal(values[0]))
+            else:
+                stmt = stmt.where(tuple_(*columns) > tuple_(*map(literal, values)))
+        elif offset:
+            stmt = stmt.offset(offset)
+
+        try:
+            records = await self._db.fetch_all(stmt)
+
+        except SQLAlchemyError as exc:
+            logger.error("`%s` statement failed: %s", self._model.__tablename__, exc)
             raise DatabaseException(
                 "Error fetching data.",
             ) from exc
 
-    async def create(self, **mapping: Mapping[Any,Any]) -> int | None:
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = self._encode_cursor(records[-1], order_by)
+
+        return Page(records, next_cursor)
+
+    async def iter_all(
+        self, where: Any = None, chunk_size: int | None = None
+    ) -> AsyncIterator[Any]:
+        """streams the model registries straight from the database cursor,
+        ordered by the primary key, so the memory used doesn't depend on
+        the table size.
+
+        Args:
+            where (Any, optional): a where clause to filter the registries. Defaults to None.
+            chunk_size (int | None, optional): if sent, yields lists with up to
+            `chunk_size` registries instead of one registry at a time. Defaults to None.
+
+        Raises:
+            DatabaseException: if some exception related to the sqlalchemy occur.
+
+        Yields:
+            Record | List[Record]: the registries, or chunks of them.
+        """
+        stmt = self._select().order_by(*self._model.__table__.primary_key.columns)
+        if where is not None:
+            stmt = stmt.where(where)
+
+        chunk: List[Record] = []
+        try:
+            async for record in self._db.iterate(stmt):
+                if chunk_size is None:
+                    yield record
+                    continue
+
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+
+        except SQLAlchemyError as exc:
+            logger.error("`%s` statement failed: %s", self._model.__tablename__, exc)
+            raise DatabaseException(
+                "Error fetching data.",
+            ) from exc
+
+        if chunk:
+            yield chunk
+
+    async def create(
+        self, *, returning: bool = False, **mapping: Mapping[Any,Any]
+    ) -> int | Record | None:
         """creates a new registry in database
 
+        Args:
+            returning (bool, optional): if True the stored registry is returned by
+            the same statement (`INSERT ... RETURNING`). Defaults to False.
+
         Returns:
-            int: 1 if created with success
+            int | Record: 1 if created with success or the created registry when `returning` is True
         """
         self._check_fields(list(mapping.keys()))
 
@@ -88,17 +320,51 @@ class DatabaseController:
             self._model(**mapping).validate()
 
             stmt = insert(self._model)
-            return await self._db.execute(stmt, values=mapping)
+            if returning:
+                created = await self._db.fetch_one(
+                    stmt.returning(*self._model.__table__.columns), values=mapping
+                )
+            else:
+                created = await self._db.execute(stmt, values=mapping)
 
         except SQLAlchemyError as exc:
-            print(str(exc))
+            logger.error("`%s` statement failed: %s", self._model.__tablename__, exc)
             raise DatabaseException("Creation fail.") from exc
 
-    async def update_(self, id: int, **mapping: Mapping) -> bool:
+        self._invalidate(record_id(created) if returning else created)
+        return created
+
+    async def create_many(
+        self,
+        rows: Sequence[Mapping[str, Any]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """validates all the rows and then creates them in a single transaction
+        using multi-row inserts, so a big load pays one commit instead of one per row.
+
+        Args:
+            rows (Sequence[Mapping[str, Any]]): the registries to create, all with the same fields.
+            chunk_size (int, optional): the max number of rows per insert statement. Defaults to 500.
+
+        Raises:
+            BulkValidationException: some rows are invalid, nothing is created.
+            DatabaseException: if some exception related to the sqlalchemy occur.
+
+        Returns:
+            int: the number of created rows
+        """
+        self._validate_many(rows)
+        return await self._insert_many(rows, chunk_size)
+
+    async def update_(
+        self, id: int, *, returning: bool = False, **mapping: Mapping
+    ) -> bool | Record | None:
         """updates an registry from database
 
         Args:
             id (int): the registry id
+            returning (bool, optional): if True the updated registry is returned by
+            the same statement (`UPDATE ... RETURNING`), None if the id doesn't exist. Defaults to False.
             mapping (Mapping): the registry fields mapping to be updated
         """
         if not isinstance(id, int):
@@ -110,16 +376,96 @@ class DatabaseController:
             stmt = (
                 update(self._model).where(self._model.id == id).values(**mapping)  # type: ignore
             )
-            return await self._db.execute(stmt)
+            if returning:
+                updated = await self._db.fetch_one(
+                    stmt.returning(*self._model.__table__.columns)
+                )
+            else:
+                updated = await self._db.execute(stmt)
 
         except SQLAlchemyError as e:
             raise DatabaseException("Update fail.") from e
 
+        self._invalidate(id)
+        return updated
+
+    async def exists(self, *where: Any, **criteria: Any) -> bool:
+        """checks if there is a registry matching the where clauses and where
+        every field equals to the given value, without fetching it
+        (`SELECT 1 ... LIMIT 1`).
+
+        Args:
+            where (Any): the where clauses to apply.
+            criteria (Any): the field names and the values they must be equal to.
+
+        Raises:
+            DatabaseException: if some exception related to the sqlalchemy occur.
+
+        Returns:
+            bool: True if there is at least one registry.
+        """
+        stmt = select(literal(1)).select_from(self._model)
+        stmt = stmt.where(*where, *self._criteria(criteria)).limit(1)
+        try:
+            return await self._db.fetch_one(stmt) is not None
+
+        except SQLAlchemyError as exc:
+            logger.error("`%s` statement failed: %s", self._model.__tablename__, exc)
+            raise DatabaseException(
+                "Error fetching data.",
+            ) from exc
+
+    async def count(
+        self, *where: Any, approximate: bool = False, **criteria: Any
+    ) -> int:
+        """counts the registries matching the where clauses and where every field
+        equals to the given value.
+
+        Args:
+            where (Any): the where clauses to apply.
+            approximate (bool, optional): if True a count done in the last
+            `COUNT_CACHE_TTL` seconds may be returned instead. Defaults to False.
+            criteria (Any): the field names and the values they must be equal to.
+
+        Raises:
+            DatabaseException: if some exception related to the sqlalchemy occur.
+
+        Returns:
+            int: the number of registries.
+        """
+        stmt = select(func.count()).select_from(self._model)
+        stmt = stmt.where(*where, *self._criteria(criteria))
+
+        key = None
+        if approximate:
+            params = stmt.compile().params
+            key = (str(stmt), repr(sorted(params.items())))
+            cached = count_cache().get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            total = await self._db.fetch_val(stmt)
+
+        except SQLAlchemyError as exc:
+            logger.error("`%s` statement failed: %s", self._model.__tablename__, exc)
+            raise DatabaseException(
+                "Error fetching data.",
+            ) from exc
+
+        if key is not None:
+            count_cache().set(key, total)
+        return total
+
     async def query(self, q, **values):
-        """executes the given query"""
+        """executes the given query. Statements that are not selects drop all
+        the cached registries of the model."""
         if q._is_select_statement:
             return await self._db.fetch_all(q, values=values)
-        return await self._db.execute(q, values=values)
+
+        result = await self._db.execute(q, values=values)
+        self._invalidate_all()
+        return result
 
     async def delete_(self, id: int):
         """deletes a registry from database
@@ -136,6 +482,158 @@ class DatabaseController:
         except SQLAlchemyError:
             raise DatabaseException("Delete operation fail.")
 
+        self._invalidate(id)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        """opens a database transaction. The cached registries written inside
+        it are dropped again when it ends, so a reader running concurrently
+        can't keep a row read before the commit in the cache."""
+        token = None
+        if _pending_invalidations.get() is None:
+            token = _pending_invalidations.set(set())
+
+        try:
+            async with self._db.transaction():
+                yield
+
+        finally:
+            if token is not None:
+                pending = _pending_invalidations.get() or set()
+                _pending_invalidations.reset(token)
+                for table, id in pending:
+                    cache = entity_caches().get(table)
+                    if cache is not None:
+                        cache.invalidate(id)
+
+    def _validate_many(self, rows: Sequence[Mapping[str, Any]]):
+        """validates every row and raises BulkValidationException with the
+        index and the detail of each invalid one."""
+        errors = []
+        fields = set(rows[0]) if rows else set()
+        for index, row in enumerate(rows):
+            try:
+                if set(row) != fields:
+                    raise ValidationException("the fields differ from the first row.")
+                self._check_fields(list(row))
+                self._model(**row).validate()
+
+            except ValidationException as exc:
+                errors.append((index, exc.detail))
+
+            except (TypeError, ValueError) as exc:
+                errors.append((index, str(exc)))
+
+        if errors:
+            raise BulkValidationException(errors)
+
+    async def _insert_many(
+        self, rows: Sequence[Mapping[str, Any]], chunk_size: int
+    ) -> int:
+        """inserts the already validated rows in chunks inside one transaction"""
+        if not rows:
+            return 0
+
+        max_chunk = self.SQLITE_MAX_VARIABLES // len(rows[0])
+        chunk_size = max(1, min(chunk_size, max_chunk))
+        try:
+            async with self.transaction():
+                for start in range(0, len(rows), chunk_size):
+                    chunk = list(rows[start:start + chunk_size])
+                    await self._db.execute(insert(self._model).values(chunk))
+
+        except SQLAlchemyError as exc:
+            logger.error("`%s` statement failed: %s", self._model.__tablename__, exc)
+            raise DatabaseException("Creation fail.") from exc
+
+        self._invalidate_all()
+
+        return len(rows)
+
+    def _criteria(self, criteria: Mapping[str, Any]) -> List[Any]:
+        """returns the equality clauses of the criteria fields"""
+        self._check_fields(list(criteria))
+        return [
+            getattr(self._model, field) == value for field, value in criteria.items()
+        ]
+
+    def invalidate(self, *ids: Any):
+        """drops the cached and the loaded registries with the given ids, for
+        the writes made on the model outside of its controller"""
+        for id in ids:
+            self._invalidate(id)
+
+    def invalidate_all(self):
+        """drops all the cached and the loaded registries of the model"""
+        self._invalidate_all()
+
+    def _select(self, columns: Sequence[str] | None = None):
+        """returns a select of the given columns, or of the whole model if None.
+        Subclasses override it to compute some column on every read."""
+        if not columns:
+            return select(self._model)
+        return select(*(getattr(self._model, column) for column in columns))
+
+    def _in_transaction(self) -> bool:
+        """True if the current task is inside a transaction block"""
+        # `databases` binds one connection per task and keeps its open
+        # transactions in a stack.
+        connection = getattr(self._db, "_connection", None)
+        return bool(getattr(connection, "_transaction_stack", None))
+
+    def _invalidate(self, id: Any):
+        """drops the cached and the loaded registry with the given id of the model"""
+        table = self._model.__tablename__
+        identities = current_identity_map()
+        if identities is not None:
+            identities.invalidate(table, id)
+
+        cache = entity_caches().get(table)
+        if cache is None:
+            return
+
+        cache.invalidate(id)
+        pending = _pending_invalidations.get()
+        if pending is not None:
+            pending.add((table, id))
+
+    def _invalidate_all(self):
+        """drops all the cached and the loaded registries of the model"""
+        identities = current_identity_map()
+        if identities is not None:
+            identities.invalidate_table(self._model.__tablename__)
+
+        cache = entity_caches().get(self._model.__tablename__)
+        if cache is not None:
+            cache.clear()
+
+    def _encode_cursor(self, record: Record, fields: Sequence[str]) -> str:
+        """returns the opaque cursor that points to the given record"""
+        values = [record._mapping[field] for field in fields]
+        raw = json.dumps(values, default=str, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str, size: int) -> list:
+        """returns the key values stored in the cursor. Datetimes are kept in
+        the same text format SQLite stores them so they compare correctly.
+
+        Raises:
+            DatabaseException: the cursor is malformed.
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, ValueError) as exc:
+            raise DatabaseException(
+                "Invalid cursor.", code=HTTPStatus.UNPROCESSABLE_ENTITY
+            ) from exc
+
+        if not isinstance(values, list) or len(values) != size:
+            raise DatabaseException(
+                "Invalid cursor.", code=HTTPStatus.UNPROCESSABLE_ENTITY
+            )
+        return values
+
     def _check_fields(self, fields: Sequence[str]):
         """raises DatabaseException if any of the given fields dos not exists."""
         for field in fields:
@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, Iterator, Set, Tuple
+
+from .cache import record_id
+
+_identity_map: ContextVar["IdentityMap | None"] = ContextVar(
+    "identity_map", default=None
+)
+
+
+class IdentityMap:
+    """the registries already loaded by the current request keyed by
+    (model, field, value), so a repeated lookup of the same row doesn't hit
+    the database again. Keeps an index of the keys of each registry id, so
+    a write on the id drops every key that points to it."""
+
+    def __init__(self) -> None:
+        self._records: Dict[Hashable, Any] = {}
+        self._keys_by_id: Dict[Tuple[str, Any], Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, table: str, field: str, value: Any) -> Any:
+        """returns the loaded registry where `field` equals to `value`"""
+        return self._records.get((table, field, value))
+
+    def add(self, table: str, field: str, value: Any, record: Any):
+        """keeps the registry loaded by `field` equals to `value`"""
+        key = (table, field, value)
+        self._records[key] = record
+        self._keys_by_id.setdefault((table, record_id(record)), set()).add(key)
+
+    def invalidate(self, table: str, id: Any):
+        """drops all the keys of the registry with the given id"""
+        for key in self._keys_by_id.pop((table, id), set()):
+            self._records.pop(key, None)
+
+    def invalidate_table(self, table: str):
+        """drops all the registries of the table"""
+        for table_id in [key for key in self._keys_by_id if key[0] == table]:
+            self.invalidate(*table_id)
+
+
+def current_identity_map() -> IdentityMap | None:
+    """returns the identity map of the current request, None outside of one"""
+    return _identity_map.get()
+
+
+@contextmanager
+def identity_map() -> Iterator[IdentityMap]:
+    """binds a new identity map to the current task for the block"""
+    identities = IdentityMap()
+    token = _identity_map.set(identities)
+    try:
+        yield identities
+    finally:
+        _identity_map.reset(token)
+
+
+class IdentityMapMiddleware:
+    """ASGI middleware that gives each request its own identity map"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with identity_map():
+            await self.app(scope, receive, send)
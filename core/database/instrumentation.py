@@ -0,0 +1,287 @@
+import hashlib
+import logging
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Mapping, Tuple
+
+from core.settings import settings
+
+logger = logging.getLogger("core.database.queries")
+
+# the ASGI scope of the request being handled by the current task. FastAPI
+# stores the matched route on it, so the route template is read lazily.
+_current_scope: ContextVar[Dict[str, Any] | None] = ContextVar(
+    "current_scope", default=None
+)
+
+_MULTI_ROW_PARAM = re.compile(r"_m\d+\b")
+_REPEATED_GROUP = re.compile(r"(\([^()]*\))(?:, \1)+")
+_WHITESPACE = re.compile(r"\s+")
+
+_FINGERPRINTS: Dict[Any, Tuple[str, str]] = {}
+_MAX_FINGERPRINTS = 2048
+
+
+class QueryMetric:
+    """the aggregated measures of the statements of one fingerprint. Keeps
+    the last `samples` durations to compute the percentiles.
+
+    Args:
+        statement (str): the normalized SQL of the fingerprint.
+        samples (int): the max number of durations kept.
+    """
+
+    def __init__(self, statement: str, samples: int) -> None:
+        self.statement = statement
+        self.count = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.routes: Dict[str, int] = {}
+        self._durations: Deque[float] = deque(maxlen=samples)
+
+    def observe(self, duration_ms: float, rows: int, route: str | None):
+        """adds one execution of the statement"""
+        self.count += 1
+        self.rows += rows
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self._durations.append(duration_ms)
+        if route is not None:
+            self.routes[route] = self.routes.get(route, 0) + 1
+
+    def percentile(self, percent: float) -> float:
+        """returns the nearest-rank percentile of the kept durations"""
+        if not self._durations:
+            return 0.0
+        durations = sorted(self._durations)
+        rank = max(1, round(percent / 100 * len(durations)))
+        return durations[rank - 1]
+
+    def stats(self) -> Dict[str, Any]:
+        """returns the measures of the fingerprint"""
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "routes": dict(self.routes),
+        }
+
+
+class QueryStats:
+    """in-process aggregate of the statements issued by the controllers,
+    keyed by the statement fingerprint."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, QueryMetric] = {}
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def observe(
+        self,
+        fingerprint: str,
+        statement: str,
+        duration_ms: float,
+        rows: int,
+        route: str | None = None,
+    ):
+        """adds one execution of the statement with the given fingerprint"""
+        metric = self._metrics.get(fingerprint)
+        if metric is None:
+            metric = self._metrics[fingerprint] = QueryMetric(
+                statement, settings.QUERY_STATS_SAMPLES
+            )
+        metric.observe(duration_ms, rows, route)
+
+    def get(self, fingerprint: str) -> QueryMetric | None:
+        """returns the metric of the fingerprint if it was observed"""
+        return self._metrics.get(fingerprint)
+
+    def clear(self):
+        """drops all the measures"""
+        self._metrics.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """returns the measures of every fingerprint, the most expensive first"""
+        metrics = sorted(
+            self._metrics.items(), key=lambda item: item[1].total_ms, reverse=True
+        )
+        return {fingerprint: metric.stats() for fingerprint, metric in metrics}
+
+
+_QUERY_STATS = QueryStats()
+
+
+def query_stats() -> QueryStats:
+    """returns the aggregate of the statements issued in this process"""
+    return _QUERY_STATS
+
+
+class Observation:
+    """the rows of a statement being measured, set by the caller"""
+
+    __slots__ = ("rows",)
+
+    def __init__(self) -> None:
+        self.rows = 0
+
+
+class InstrumentedDatabase:
+    """wraps a `databases.Database` measuring every statement issued through
+    it. Any other attribute is delegated to the wrapped database.
+
+    Args:
+        db (Database): the database to wrap.
+    """
+
+    def __init__(self, db) -> None:
+        self._database = db
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._database, name)
+
+    @property
+    def database(self):
+        """the wrapped database"""
+        return self._database
+
+    async def fetch_one(self, query, values: Mapping | None = None):
+        with observe(query, values) as obs:
+            record = await self._database.fetch_one(query, values)
+            obs.rows = int(record is not None)
+        return record
+
+    async def fetch_all(self, query, values: Mapping | None = None):
+        with observe(query, values) as obs:
+            records = await self._database.fetch_all(query, values)
+            obs.rows = len(records)
+        return records
+
+    async def fetch_val(self, query, values: Mapping | None = None):
+        with observe(query, values) as obs:
+            value = await self._database.fetch_val(query, values)
+            obs.rows = 1
+        return value
+
+    async def execute(self, query, values: Mapping | None = None):
+        with observe(query, values):
+            return await self._database.execute(query, values)
+
+    async def iterate(self, query, values: Mapping | None = None) -> AsyncIterator:
+        # the duration includes the time the consumer holds each record
+        with observe(query, values) as obs:
+            async for record in self._database.iterate(query, values):
+                obs.rows += 1
+                yield record
+
+
+@contextmanager
+def observe(query: Any, values: Mapping | None = None) -> Iterator[Observation]:
+    """measures the block that executes `query` and adds it to the query
+    stats, logging the statement when it is slower than the configured
+    `SLOW_QUERY_THRESHOLD_MS`."""
+    obs = Observation()
+    start = time.perf_counter()
+    try:
+        yield obs
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        key, statement = fingerprint(query)
+        route = current_route()
+        _QUERY_STATS.observe(key, statement, duration_ms, obs.rows, route)
+
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+            logger.warning(
+                "slow query %s %.3f ms rows=%d route=%s: %s params=%s",
+                key,
+                duration_ms,
+                obs.rows,
+                route,
+                statement,
+                parameter_shapes(query, values),
+            )
+
+
+def fingerprint(query: Any) -> Tuple[str, str]:
+    """returns the fingerprint and the normalized SQL of the statement. The
+    bound values are not part of it, and multi-row inserts of any size share
+    the same fingerprint."""
+    cache_key = _cache_key(query)
+    cached = _FINGERPRINTS.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        return cached
+
+    statement = _WHITESPACE.sub(" ", str(query)).strip()
+    statement = _REPEATED_GROUP.sub(r"\1, ...", _MULTI_ROW_PARAM.sub("_m", statement))
+    result = (hashlib.sha1(statement.encode()).hexdigest()[:12], statement)
+
+    if cache_key is not None:
+        if len(_FINGERPRINTS) >= _MAX_FINGERPRINTS:
+            _FINGERPRINTS.clear()
+        _FINGERPRINTS[cache_key] = result
+    return result
+
+
+def parameter_shapes(query: Any, values: Mapping | None = None) -> Dict[str, str]:
+    """returns the type name of each bound parameter, never its value"""
+    params: Dict[str, Any] = {}
+    if hasattr(query, "compile"):
+        params.update(query.compile().params)
+    params.update(values or {})
+    return {name: _shape(value) for name, value in params.items()}
+
+
+def current_route() -> str | None:
+    """returns the method and the route template of the request being handled"""
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method')} {path}"
+
+
+class QueryRouteMiddleware:
+    """ASGI middleware that binds the request scope to the task, so the
+    statements issued while handling it are attributed to its route."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
+
+
+def _cache_key(query: Any) -> Any:
+    """returns a hashable key of the statement structure, None if it has not"""
+    if isinstance(query, str):
+        return query
+
+    generate = getattr(query, "_generate_cache_key", None)
+    cache_key = generate() if generate is not None else None
+    return cache_key.key if cache_key is not None else None
+
+
+def _shape(value: Any) -> str:
+    if isinstance(value, (list, tuple, set)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import select
+
+from .instrumentation import InstrumentedDatabase
+
+_LOADERS: Dict[Tuple[int, str, str], "BatchLoader"] = {}
+
+
+class BatchLoader:
+    """collects the lookups of one model field issued in the same event loop
+    tick and loads them with a single `WHERE field IN (...)` query, handing
+    each awaiting coroutine its own registry.
+
+    Args:
+        db (Database): the database used to run the batched query.
+        model (Any): the model to load.
+        field (str): the unique field used in the lookups.
+        statement (Select | None, optional): the select of the registries. Defaults to the whole model.
+        max_batch (int, optional): the max number of values per query. Defaults to 500.
+    """
+
+    def __init__(
+        self, db, model: Any, field: str, statement=None, max_batch: int = 500
+    ) -> None:
+        self._db = db
+        self._model = model
+        self._field = field
+        self._statement = select(model) if statement is None else statement
+        self.max_batch = max_batch
+        self.batches = 0
+        self.loads = 0
+        self._pending: Dict[Any, asyncio.Future] = {}
+
+    async def load(self, value: Any) -> Any:
+        """returns the registry where the field equals to `value`, or None"""
+        self.loads += 1
+        future = self._pending.get(value)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = self._pending[value] = loop.create_future()
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """returns the number of lookups and of queries issued"""
+        return {"loads": self.loads, "batches": self.batches}
+
+    def _dispatch(self):
+        pending, self._pending = self._pending, {}
+        values = list(pending)
+        for start in range(0, len(values), self.max_batch):
+            chunk = values[start:start + self.max_batch]
+            asyncio.ensure_future(self._fetch({value: pending[value] for value in chunk}))
+
+    async def _fetch(self, pending: Dict[Any, asyncio.Future]):
+        self.batches += 1
+        field = getattr(self._model, self._field)
+        try:
+            stmt = self._statement.where(field.in_(list(pending)))
+            records = await self._db.fetch_all(stmt)
+
+        except Exception as exc:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        found = {record._mapping[self._field]: record for record in records}
+        for value, future in pending.items():
+            if not future.done():
+                future.set_result(found.get(value))
+
+
+def batch_loader(db, model: Any, field: str, statement=None) -> BatchLoader:
+    """returns the batch loader of the model field on the database, creating it
+    with the given select. The loader is shared by all the controllers of the
+    same database."""
+    database = getattr(db, "database", db)
+    key = (id(database), model.__tablename__, field)
+    if key not in _LOADERS:
+        _LOADERS[key] = BatchLoader(
+            InstrumentedDatabase(database), model, field, statement
+        )
+    return _LOADERS[key]
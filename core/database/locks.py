@@ -0,0 +1,95 @@
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Hashable, List
+
+_LOCK_MANAGERS: Dict[str, "LockManager"] = {}
+
+
+class LockManager:
+    """in-process `asyncio.Lock` per key, used to serialize the operations
+    on the same registry. The locks are kept by weak references, so the lock
+    of a key lives only while some task holds or waits for it and the memory
+    is bounded by the keys in use.
+
+    Args:
+        name (str): the name of the locked resource.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.acquisitions = 0
+        self.contentions = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._locks: "weakref.WeakValueDictionary[Hashable, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def lock(self, key: Hashable) -> asyncio.Lock:
+        """returns the lock of the key, creating it"""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def acquire(self, *keys: Hashable) -> AsyncIterator[None]:
+        """holds the locks of all the keys for the block. The locks are
+        acquired in sorted key order, so two tasks locking the same keys
+        can't deadlock, and a repeated key is locked once.
+
+        Args:
+            keys (Hashable): the keys to lock, must be comparable to each other.
+        """
+        locks: List[asyncio.Lock] = [self.lock(key) for key in sorted(set(keys))]
+        acquired: List[asyncio.Lock] = []
+        try:
+            for lock in locks:
+                await self._acquire(lock)
+                acquired.append(lock)
+            yield
+
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """returns the lock counters"""
+        return {
+            "locks": len(self._locks),
+            "acquisitions": self.acquisitions,
+            "contentions": self.contentions,
+            "total_wait_ms": round(self.total_wait_ms, 3),
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+    async def _acquire(self, lock: asyncio.Lock):
+        """acquires the lock measuring the time waited for it"""
+        self.acquisitions += 1
+        if not lock.locked():
+            await lock.acquire()
+            return
+
+        self.contentions += 1
+        start = time.perf_counter()
+        await lock.acquire()
+        wait_ms = (time.perf_counter() - start) * 1000
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+
+def lock_manager(name: str) -> LockManager:
+    """returns the lock manager of the resource, creating it"""
+    if name not in _LOCK_MANAGERS:
+        _LOCK_MANAGERS[name] = LockManager(name)
+    return _LOCK_MANAGERS[name]
+
+
+def lock_managers() -> Dict[str, LockManager]:
+    """returns all the lock managers created by resource name"""
+    return _LOCK_MANAGERS
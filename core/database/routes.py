@@ -0,0 +1,75 @@
+from typing import Annotated, Any, Dict
+
+from fastapi import APIRouter, Depends
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from core.auth.controllers import JWTController
+
+from .cache import entity_caches
+from .instrumentation import query_stats
+from .locks import lock_managers
+
+router = APIRouter(prefix="/database", tags=["database"])
+jwt_ctrl = JWTController()
+bearer = HTTPBearer()
+
+
+@router.get(
+    "/cache",
+    summary="Retorna as métricas dos caches de entidades.",
+    description="Retorna os contadores de acertos, falhas e remoções de cada cache. Somente usuários com a role `admin` podem acessar.",
+)
+async def cache_stats(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer)],
+) -> Dict[str, Dict[str, Any]]:
+    """returns the counters of each entity cache. Only admin users can access.
+
+    Args:
+        credentials (Annotated[HTTPAuthorizationCredentials, Depends): authorization header value.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: the cache stats by table name.
+    """
+    jwt_ctrl.validate_token(credentials, required_roles="admin")
+    return {table: cache.stats() for table, cache in entity_caches().items()}
+
+
+@router.get(
+    "/queries",
+    summary="Retorna as métricas das consultas ao banco de dados.",
+    description="Retorna, para cada fingerprint de consulta, a quantidade de execuções, linhas retornadas, os percentis p50/p95/p99 do tempo e as rotas que as executaram. Somente usuários com a role `admin` podem acessar.",
+)
+async def queries_stats(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer)],
+) -> Dict[str, Dict[str, Any]]:
+    """returns the aggregated measures of the statements by fingerprint, the
+    most expensive first. Only admin users can access.
+
+    Args:
+        credentials (Annotated[HTTPAuthorizationCredentials, Depends): authorization header value.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: the statement stats by fingerprint.
+    """
+    jwt_ctrl.validate_token(credentials, required_roles="admin")
+    return query_stats().stats()
+
+
+@router.get(
+    "/locks",
+    summary="Retorna as métricas dos locks por registro.",
+    description="Retorna, para cada recurso, a quantidade de locks em uso, de aquisições, de aquisições que esperaram por outra operação e o tempo de espera. Somente usuários com a role `admin` podem acessar.",
+)
+async def locks_stats(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer)],
+) -> Dict[str, Dict[str, Any]]:
+    """returns the counters of each lock manager. Only admin users can access.
+
+    Args:
+        credentials (Annotated[HTTPAuthorizationCredentials, Depends): authorization header value.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: the lock stats by resource name.
+    """
+    jwt_ctrl.validate_token(credentials, required_roles="admin")
+    return {name: locks.stats() for name, locks in lock_managers().items()}
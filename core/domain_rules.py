@@ -44,6 +44,8 @@ class TransactionRules(BaseModel):
     MIN_TRANSFER_VALUE: Decimal = Decimal("0.01")
     MAX_TRANSFER_VALUE: Decimal = Decimal("10_000")
 
+    MAX_BATCH_SIZE: int = 1000
+
 
 class AccountRules(BaseModel):
     """stores all the business rules related to the accounts part"""
@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from typing import List, Tuple
 
 
 class ValidationException(Exception):
@@ -14,6 +15,17 @@ class DatabaseException(ValidationException):
         super().__init__(detail, code=code)
 
 
+class BulkValidationException(ValidationException):
+    """some rows of a bulk operation are invalid. `errors` keeps the index
+    of each invalid row with the validation detail."""
+    def __init__(
+        self, errors: List[Tuple[int, str]], *, code=HTTPStatus.UNPROCESSABLE_ENTITY
+    ) -> None:
+        self.errors = errors
+        detail = "; ".join(f"row {index}: {detail}" for index, detail in errors)
+        super().__init__(detail, code=code)
+
+
 # user exceptions
 class UserWeakPasswordException(ValidationException):
     """the user password is too weak"""
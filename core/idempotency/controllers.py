@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.database.cache import TTLCache
+from core.database.controller import DatabaseController
+from core.exceptions import DatabaseException
+from core.settings import settings
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+
+class StoredResponse(NamedTuple):
+    """the response replayed for a retried request
+
+    Args:
+        request_hash (str): hash of the body of the original request.
+        status_code (int): the status code of the original response.
+        media_type (str): the content type of the original response.
+        body (bytes): the body of the original response.
+    """
+    request_hash: str
+    status_code: int
+    media_type: str
+    body: bytes
+
+
+_FRONT = TTLCache(settings.IDEMPOTENCY_CACHE_MAXSIZE, settings.IDEMPOTENCY_TTL)
+
+
+class IdempotencyController(DatabaseController):
+    """controller to manage the stored responses of the idempotency keys. The
+    responses are read through an in-process LRU cache in front of the table."""
+
+    def __init__(self) -> None:
+        super().__init__(model=IdempotencyKey)
+
+    async def load(self, key: str) -> StoredResponse | None:
+        """returns the not expired response stored for the key
+
+        Args:
+            key (str): the hashed idempotency key.
+
+        Returns:
+            StoredResponse | None: the stored response, None if there is not.
+        """
+        stored = _FRONT.get(key)
+        if stored is not None:
+            return stored
+
+        try:
+            stmt = select(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.expires_at > _now()
+            )
+            record = await self._db.fetch_one(stmt)
+
+        except SQLAlchemyError as exc:
+            raise DatabaseException("Error fetching data.") from exc
+
+        if record is None:
+            return None
+
+        stored = StoredResponse(
+            record.request_hash, record.status_code, record.media_type, record.body
+        )
+        _FRONT.set(key, stored)
+        return stored
+
+    async def save(self, key: str, response: StoredResponse):
+        """stores the response of the key until `IDEMPOTENCY_TTL` seconds from now.
+        If the key was already stored by another process the first one is kept.
+
+        Args:
+            key (str): the hashed idempotency key.
+            response (StoredResponse): the response to store.
+        """
+        expires_at = _now() + timedelta(seconds=settings.IDEMPOTENCY_TTL)
+        stmt = (
+            insert(IdempotencyKey)
+            .values(key=key, expires_at=expires_at, **response._asdict())
+            .on_conflict_do_nothing(index_elements=[IdempotencyKey.key])
+        )
+        try:
+            await self._db.execute(stmt)
+
+        except SQLAlchemyError as exc:
+            raise DatabaseException("Creation fail.") from exc
+
+        _FRONT.set(key, response)
+
+    async def sweep(self) -> int:
+        """deletes the expired keys
+
+        Returns:
+            int: the number of keys deleted.
+        """
+        stmt = (
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.expires_at <= _now())
+            .returning(IdempotencyKey.key)
+        )
+        try:
+            expired = await self._db.fetch_all(stmt)
+
+        except SQLAlchemyError as exc:
+            raise DatabaseException("Delete operation fail.") from exc
+
+        return len(expired)
+
+
+def stored_responses() -> TTLCache:
+    """returns the in-process LRU cache in front of the idempotency table"""
+    return _FRONT
+
+
+def _now() -> datetime:
+    """the current UTC time without timezone, as SQLite stores it"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def sweep_expired_keys(interval: float):
+    """deletes the expired idempotency keys every `interval` seconds until
+    cancelled. Meant to run as a background task during the app lifespan."""
+    ctrl = IdempotencyController()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            deleted = await ctrl.sweep()
+        except DatabaseException:
+            logger.exception("idempotency keys sweep failed")
+            continue
+
+        if deleted:
+            logger.info("%d expired idempotency keys deleted", deleted)
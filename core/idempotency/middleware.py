@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+from typing import Dict, List
+
+from .controllers import IdempotencyController, StoredResponse
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware that makes the write requests sent with an
+    `Idempotency-Key` header run once. The response of the first execution is
+    stored and a retry with the same key, method, path and credentials gets it
+    back without running the route again. Concurrent duplicates wait for the
+    first execution instead of racing with it. Server errors are not stored,
+    so they can be retried."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        key = _hash(
+            scope["method"].encode(),
+            scope["path"].encode(),
+            headers.get(b"authorization", b""),
+            idempotency_key,
+        )
+        request_hash = _hash(body)
+        ctrl = IdempotencyController()
+
+        while True:
+            stored = await ctrl.load(key)
+            if stored is not None:
+                await _replay(stored, request_hash, send)
+                return
+
+            running = self._in_flight.get(key)
+            if running is None:
+                break
+            await asyncio.shield(running)
+
+        done = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            response = await self._run(scope, body, receive, send, request_hash)
+            if response.status_code < 500:
+                await ctrl.save(key, response)
+        finally:
+            del self._in_flight[key]
+            done.set_result(None)
+
+    async def _run(self, scope, body, receive, send, request_hash) -> StoredResponse:
+        """runs the route with the already read body and returns its response"""
+        body_sent = False
+        status_code = 500
+        media_type = ""
+        chunks: List[bytes] = []
+
+        async def replay_receive():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture_send(message):
+            nonlocal status_code, media_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                media_type = dict(message.get("headers", [])).get(
+                    b"content-type", b""
+                ).decode()
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, replay_receive, capture_send)
+        return StoredResponse(request_hash, status_code, media_type, b"".join(chunks))
+
+
+async def _read_body(receive) -> bytes:
+    """reads the whole request body"""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _replay(stored: StoredResponse, request_hash: str, send):
+    """sends the stored response, or 422 if the key was used with other body"""
+    if stored.request_hash != request_hash:
+        status_code = 422
+        media_type = "application/json"
+        body = json.dumps(
+            {"detail": "Idempotency-Key already used with a different request."}
+        ).encode()
+    else:
+        status_code, media_type, body = (
+            stored.status_code, stored.media_type, stored.body
+        )
+
+    headers = [
+        (b"content-length", str(len(body)).encode()),
+        (REPLAYED_HEADER, b"true"),
+    ]
+    if media_type:
+        headers.append((b"content-type", media_type.encode()))
+
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def _hash(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
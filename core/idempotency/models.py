@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import TIMESTAMP, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database.conf import Base
+
+
+class IdempotencyKey(Base):
+    """the response stored for an `Idempotency-Key` of a write request
+
+    Args:
+        key (str): hash of the key, the method, the path and the credentials. Primary key.
+        request_hash (str): hash of the request body, a reused key with other body is refused.
+        status_code (int): the status code of the stored response.
+        media_type (str): the content type of the stored response.
+        body (bytes): the body of the stored response.
+        expires_at (datetime): when the key expires and can be swept.
+    """
+
+    __tablename__ = "idempotency_key"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    media_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False, index=True)
+
+    def validate(self): ...
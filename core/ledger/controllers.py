@@ -0,0 +1,256 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.accounts.controllers import AccountController
+from core.accounts.models import Account
+from core.database.controller import DatabaseController
+from core.exceptions import DatabaseException
+from core.settings import settings
+
+from .models import BalanceCheckpoint, Posting
+
+Entry = Tuple[int | None, Decimal]
+
+
+class AccountBalance(NamedTuple):
+    """the balance of an account as seen by the ledger
+
+    Args:
+        balance (Decimal): the current balance.
+        pending (int): the postings written after the checkpoint.
+        checkpointed (bool): False while the account has no posting and the balance is its `amount`.
+    """
+    balance: Decimal
+    pending: int
+    checkpointed: bool
+
+
+class LedgerController(DatabaseController):
+    """controller of the double-entry journal. The movements are only
+    appended as postings, the balance of an account is its last checkpoint
+    plus the postings after it. A checkpoint is taken every
+    `LEDGER_CHECKPOINT_INTERVAL` postings of the account, so reading a
+    balance never sums more than that many rows."""
+
+    def __init__(self) -> None:
+        super().__init__(model=Posting)
+        self._accounts = AccountController()
+
+    async def balances(self, ids: Iterable[int]) -> Dict[int, AccountBalance]:
+        """returns the balance of each account, the ids that don't exist are
+        not in the result
+
+        Args:
+            ids (Iterable[int]): the accounts ids.
+
+        Raises:
+            DatabaseException: if some exception related to the sqlalchemy occur.
+
+        Returns:
+            Dict[int, AccountBalance]: the balances by account id.
+        """
+        def pending(column):
+            return (
+                select(column)
+                .where(
+                    Posting.account_id == Account.id,
+                    Posting.id > func.coalesce(BalanceCheckpoint.posting_id, 0),
+                )
+                .scalar_subquery()
+            )
+
+        stmt = (
+            select(
+                Account.id,
+                Account.amount,
+                BalanceCheckpoint.balance,
+                pending(
+                    func.coalesce(func.sum(Posting.amount), 0, type_=Posting.amount.type)
+                ).label("pending_amount"),
+                pending(func.count()).label("pending"),
+            )
+            .select_from(Account)
+            .outerjoin(BalanceCheckpoint, BalanceCheckpoint.account_id == Account.id)
+            .where(Account.id.in_(list(ids)))
+        )
+        try:
+            records = await self._db.fetch_all(stmt)
+
+        except SQLAlchemyError as exc:
+            raise DatabaseException("Error fetching the balances.") from exc
+
+        balances = {}
+        for record in records:
+            if record.balance is None:
+                balances[record.id] = AccountBalance(record.amount, 0, False)
+            else:
+                balance = record.balance + record.pending_amount
+                balances[record.id] = AccountBalance(balance, record.pending, True)
+        return balances
+
+    async def post(
+        self,
+        transaction_id: int | None,
+        entries: Sequence[Entry],
+        balances: Dict[int, AccountBalance] | None = None,
+    ) -> Dict[int, Decimal]:
+        """appends the postings of a movement to the journal. The first posting
+        of an account also writes its current `amount` as the opening balance.
+
+        Args:
+            transaction_id (int | None): the transaction posted.
+            entries (Sequence[Entry]): the account id, None to the external side, and the signed amount of each posting.
+            balances (Dict[int, AccountBalance] | None, optional): the balances of the accounts
+            already read by the caller in the same transaction. Defaults to None.
+
+        Raises:
+            DatabaseException: the postings don't sum to zero or some account doesn't exist.
+            DatabaseException: if some exception related to the sqlalchemy occur.
+
+        Returns:
+            Dict[int, Decimal]: the new balance of each account.
+        """
+        if sum(amount for _, amount in entries) != 0:
+            raise DatabaseException("the postings must sum to zero.")
+
+        ids = {id for id, _ in entries if id is not None}
+        if balances is None:
+            balances = await self.balances(ids)
+        if ids - balances.keys():
+            raise DatabaseException("the account of the posting does not exists.")
+
+        try:
+            async with self.transaction():
+                opened = await self._open(
+                    {id: balances[id] for id in ids if not balances[id].checkpointed}
+                )
+                posted = await self._db.fetch_all(
+                    insert(Posting)
+                    .values(
+                        [
+                            {
+                                "transaction_id": transaction_id,
+                                "account_id": id,
+                                "amount": amount,
+                            }
+                            for id, amount in entries
+                        ]
+                    )
+                    .returning(Posting.id, Posting.account_id)
+                )
+
+                new_balances = {}
+                for id in ids:
+                    state = opened.get(id, balances[id])
+                    posting_ids = [row.id for row in posted if row.account_id == id]
+                    balance = state.balance + sum(
+                        amount for account_id, amount in entries if account_id == id
+                    )
+                    if state.pending + len(posting_ids) >= settings.LEDGER_CHECKPOINT_INTERVAL:
+                        await self._checkpoint(id, max(posting_ids), balance)
+                    new_balances[id] = balance
+
+        except SQLAlchemyError as exc:
+            raise DatabaseException("Posting fail.") from exc
+
+        self._accounts.invalidate(*ids)
+        return new_balances
+
+    async def rebuild(self) -> int:
+        """recomputes the checkpoint and the `amount` of every account with
+        postings from the whole journal.
+
+        Raises:
+            DatabaseException: if some exception related to the sqlalchemy occur.
+
+        Returns:
+            int: the number of accounts rebuilt.
+        """
+        totals = (
+            select(
+                Posting.account_id,
+                func.max(Posting.id),
+                func.sum(Posting.amount),
+            )
+            .where(Posting.account_id.is_not(None))
+            .group_by(Posting.account_id)
+        )
+        checkpoint = (
+            select(BalanceCheckpoint.balance)
+            .where(BalanceCheckpoint.account_id == Account.id)
+            .scalar_subquery()
+        )
+        try:
+            async with self.transaction():
+                await self._db.execute(delete(BalanceCheckpoint))
+                await self._db.execute(
+                    insert(BalanceCheckpoint).from_select(
+                        ["account_id", "posting_id", "balance"], totals
+                    )
+                )
+                await self._db.execute(
+                    update(Account)
+                    .where(Account.id.in_(select(BalanceCheckpoint.account_id)))
+                    .values(amount=checkpoint)
+                )
+                rebuilt = await self._db.fetch_val(
+                    select(func.count()).select_from(BalanceCheckpoint)
+                )
+
+        except SQLAlchemyError as exc:
+            raise DatabaseException("Rebuild fail.") from exc
+
+        self._accounts.invalidate_all()
+        return rebuilt
+
+    async def _open(
+        self, balances: Dict[int, AccountBalance]
+    ) -> Dict[int, AccountBalance]:
+        """writes the opening postings and the first checkpoint of the
+        accounts, returns their balances after it"""
+        if not balances:
+            return {}
+
+        openings: List[dict] = []
+        for id, state in balances.items():
+            if state.balance:
+                openings.append({"account_id": id, "amount": state.balance})
+                openings.append({"account_id": None, "amount": -state.balance})
+
+        posted = {}
+        if openings:
+            rows = await self._db.fetch_all(
+                insert(Posting).values(openings).returning(Posting.id, Posting.account_id)
+            )
+            posted = {row.account_id: row.id for row in rows if row.account_id}
+
+        await self._db.execute(
+            insert(BalanceCheckpoint).values(
+                [
+                    {
+                        "account_id": id,
+                        "posting_id": posted.get(id, 0),
+                        "balance": state.balance,
+                    }
+                    for id, state in balances.items()
+                ]
+            )
+        )
+        return {
+            id: AccountBalance(state.balance, 0, True) for id, state in balances.items()
+        }
+
+    async def _checkpoint(self, id: int, posting_id: int, balance: Decimal):
+        """moves the checkpoint of the account to the posting, and keeps the
+        balance on the account `amount`"""
+        await self._db.execute(
+            update(BalanceCheckpoint)
+            .where(BalanceCheckpoint.account_id == id)
+            .values(posting_id=posting_id, balance=balance, time=func.current_timestamp())
+        )
+        await self._db.execute(
+            update(Account).where(Account.id == id).values(amount=balance)
+        )
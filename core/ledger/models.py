@@ -0,0 +1,85 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DECIMAL, TIMESTAMP, ForeignKey, Index, func, select
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.accounts.models import Account
+from core.database.conf import Base
+
+
+class Posting(Base):
+    """one entry of the append-only journal. Every movement writes one debit
+    and one credit posting whose amounts sum to zero, the side out of the
+    bank (the source of a deposit or the destination of a withdraw) has no
+    account.
+
+    Args:
+        id (int): the posting id. Primary key, auto incremented, gives the journal order.
+        transaction_id (int | None): the transaction posted, None on the opening balance of an account.
+        account_id (int | None): the account id, None on the external side.
+        amount (Decimal): the signed amount, positive credits and negative debits.
+        time (datetime): when the posting was written.
+    """
+
+    __tablename__ = "posting"
+    __table_args__ = (Index("ix_posting_account_id_id", "account_id", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    transaction_id: Mapped[int | None] = mapped_column(
+        ForeignKey("transaction.id"), nullable=True, index=True
+    )
+    account_id: Mapped[int | None] = mapped_column(
+        ForeignKey("account.id"), nullable=True
+    )
+    amount: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    time: Mapped[datetime] = mapped_column(
+        TIMESTAMP, nullable=False, server_default=func.current_timestamp()
+    )
+
+    def validate(self): ...
+
+
+class BalanceCheckpoint(Base):
+    """the balance of an account up to a posting, the balance is the
+    checkpoint plus the postings written after it.
+
+    Args:
+        account_id (int): the account id. Primary key.
+        posting_id (int): the last posting of the account included in the balance, 0 if none.
+        balance (Decimal): the balance up to the posting.
+        time (datetime): when the checkpoint was taken.
+    """
+
+    __tablename__ = "balance_checkpoint"
+
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey("account.id"), primary_key=True
+    )
+    posting_id: Mapped[int] = mapped_column(nullable=False)
+    balance: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    time: Mapped[datetime] = mapped_column(
+        TIMESTAMP, nullable=False, server_default=func.current_timestamp()
+    )
+
+    def validate(self): ...
+
+
+def account_balance():
+    """returns the SQL expression of the balance of `Account`: its checkpoint
+    plus the postings after it, or the `amount` column while the account has
+    no checkpoint."""
+    pending = (
+        select(func.coalesce(func.sum(Posting.amount), 0))
+        .where(
+            Posting.account_id == BalanceCheckpoint.account_id,
+            Posting.id > BalanceCheckpoint.posting_id,
+        )
+        .scalar_subquery()
+    )
+    checkpointed = (
+        select(BalanceCheckpoint.balance + pending)
+        .where(BalanceCheckpoint.account_id == Account.id)
+        .scalar_subquery()
+    )
+    return func.coalesce(checkpointed, Account.amount, type_=Account.amount.type)
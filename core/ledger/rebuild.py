@@ -0,0 +1,23 @@
+"""recomputes the balance checkpoints and the `amount` of the accounts from
+the ledger journal.
+
+    python -m core.ledger.rebuild
+"""
+import asyncio
+
+from core.database.conf import DB
+from core.ledger.controllers import LedgerController
+from core.transactions.models import Transaction  # noqa: F401
+
+
+async def main():
+    await DB.connect()
+    try:
+        rebuilt = await LedgerController().rebuild()
+    finally:
+        await DB.disconnect()
+    print(f"{rebuilt} account balances rebuilt from the journal.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
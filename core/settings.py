@@ -10,5 +10,18 @@ class Settings(BaseSettings):
     ENVIRONMENT: str
     JWT_SECRET: str
 
+    ENTITY_CACHE_MAXSIZE: int = 1024
+    ENTITY_CACHE_TTL: float = 5.0
+    COUNT_CACHE_TTL: float = 30.0
+
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    QUERY_STATS_SAMPLES: int = 1024
+
+    IDEMPOTENCY_TTL: float = 86400.0
+    IDEMPOTENCY_CACHE_MAXSIZE: int = 1024
+    IDEMPOTENCY_SWEEP_INTERVAL: float = 300.0
+
+    LEDGER_CHECKPOINT_INTERVAL: int = 100
+
 
 settings = Settings()  # type: ignore # pyright: ignore
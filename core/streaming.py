@@ -0,0 +1,70 @@
+from typing import Any, AsyncIterable, AsyncIterator, Literal, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+StreamFormat = Literal["json", "ndjson"]
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def json_array(
+    records: AsyncIterable[Any], schema: Type[BaseModel]
+) -> AsyncIterator[bytes]:
+    """serializes the records one by one as the items of a JSON array
+
+    Args:
+        records (AsyncIterable[Any]): the records to serialize.
+        schema (Type[BaseModel]): the output schema of each record.
+
+    Yields:
+        bytes: the pieces of the JSON array.
+    """
+    yield b"["
+    separator = b""
+    async for record in records:
+        yield separator + _dump(record, schema)
+        separator = b","
+    yield b"]"
+
+
+async def ndjson_lines(
+    records: AsyncIterable[Any], schema: Type[BaseModel]
+) -> AsyncIterator[bytes]:
+    """serializes the records one by one as newline delimited JSON
+
+    Args:
+        records (AsyncIterable[Any]): the records to serialize.
+        schema (Type[BaseModel]): the output schema of each record.
+
+    Yields:
+        bytes: one JSON document per line.
+    """
+    async for record in records:
+        yield _dump(record, schema) + b"\n"
+
+
+def stream_records(
+    records: AsyncIterable[Any], schema: Type[BaseModel], format: StreamFormat
+) -> StreamingResponse:
+    """returns a response that writes the records as they come from the
+    database, keeping the memory constant whatever the number of rows.
+
+    Args:
+        records (AsyncIterable[Any]): the records to stream.
+        schema (Type[BaseModel]): the output schema of each record.
+        format (StreamFormat): `json` to stream a JSON array or `ndjson` for one record per line.
+
+    Returns:
+        StreamingResponse: the streaming response.
+    """
+    body = json_array if format == "json" else ndjson_lines
+    return StreamingResponse(body(records, schema), media_type=MEDIA_TYPES[format])
+
+
+def _dump(record: Any, schema: Type[BaseModel]) -> bytes:
+    """validates the record with the schema and returns its JSON"""
+    return schema.model_validate(record, from_attributes=True).model_dump_json().encode()
@@ -1,18 +1,38 @@
 from decimal import Decimal
+from typing import Any, List, Mapping, NamedTuple, Sequence
+
+from databases.interfaces import Record
 
 from core import exceptions, validators
 from core.database.controller import DatabaseController
 from core.domain_rules import domain_rules
+from core.ledger.controllers import LedgerController
 
 from .models import Transaction, TransactionType
 
 TRANSACTION_RULES = domain_rules.transaction_rules
+BATCH_NOT_APPLIED = "not applied, other item of the batch failed."
+
+
+class BatchItemResult(NamedTuple):
+    """the result of one item of a transaction batch
+
+    Args:
+        index (int): the position of the item in the batch.
+        transaction (Record | None): the created transaction, None if it was not applied.
+        detail (str | None): why the item was not applied.
+    """
+    index: int
+    transaction: Record | None
+    detail: str | None
 
 
 class TransactionController(DatabaseController):
-    """the controller to manage the transactions"""
+    """the controller to manage the transactions. The balances are moved by
+    the postings written through the ledger."""
     def __init__(self) -> None:
         super().__init__(model=Transaction)
+        self._ledger = LedgerController()
 
     async def new(
         self,
@@ -22,7 +42,10 @@ class TransactionController(DatabaseController):
         type: TransactionType,
         accounts_controller,
     ):
-        """creates a new transaction
+        """creates a new transaction and appends its postings to the ledger
+        inside the same database transaction. It runs holding the locks of both
+        accounts, so the funds check reads a balance that no other operation
+        of the process is changing.
 
         Args:
             from_account (Account): the sender account model instance.
@@ -33,51 +56,153 @@ class TransactionController(DatabaseController):
 
         Raises:
             exceptions.TransactionException: an invalid transaction type was given
+            exceptions.TransactionException: the sender has insufficient funds.
 
         Returns:
             bool: True if rows are affected
         """
-        async with self._db.transaction():
-            self.validate(from_account, to_account, value, type)
-
-            created = await self.create(
-                from_account_id=from_account.id,
-                to_account_id=to_account.id,
-                value=value,  # type: ignore
-                type=type,  # type: ignore
-            )
+        if not isinstance(type, TransactionType):
+            raise exceptions.TransactionException("Invalid transaction type.")
 
-            if type == TransactionType.deposit:
-                amount = from_account.amount + value
-                await accounts_controller.update_(
-                    from_account.id,
-                    amount=amount,
-                )
+        self.validate(from_account, to_account, value, type)
 
-            elif type == TransactionType.withdraw:
-                amount = from_account.amount - value
-                await accounts_controller.update_(
-                    from_account.id,
-                    amount=amount,
-                )
+        async with accounts_controller.lock(from_account.id, to_account.id):
+            async with self.transaction():
+                created = await self._apply(from_account, to_account, value, type)
+
+        return bool(created)
+
+    async def new_many(
+        self,
+        items: Sequence[Any],
+        accounts: Mapping[int, Any],
+        accounts_controller,
+        owner_id: int | None = None,
+        atomic: bool = True,
+    ) -> List[BatchItemResult]:
+        """validates all the items in memory and applies the valid ones in a
+        single database transaction. With `atomic` nothing is applied if some
+        item fails, otherwise each item runs in its own savepoint and only the
+        failed ones are skipped. The locks of all the accounts of the batch are
+        held until it is committed.
 
-            elif type == TransactionType.transference:
-                from_account_amount = from_account.amount - value
-                to_account_amount = to_account.amount + value
+        Args:
+            items (Sequence[Any]): the transactions data, with `from_account_id`, `to_account_id`, `value` and `type`.
+            accounts (Mapping[int, Account]): the accounts referenced by the items by id.
+            accounts_controller (AccountController): the accounts controller instance.
+            owner_id (int | None, optional): if sent, the user that must own every sender account. Defaults to None.
+            atomic (bool, optional): all-or-nothing if True, best-effort otherwise. Defaults to True.
 
-                await accounts_controller.update_(
-                    from_account.id,
-                    amount=from_account_amount,
+        Returns:
+            List[BatchItemResult]: the result of each item in the batch order.
+        """
+        results: List[BatchItemResult] = []
+        for index, item in enumerate(items):
+            detail = self._check_batch_item(item, accounts, owner_id)
+            results.append(BatchItemResult(index, None, detail))
+
+        if atomic and any(result.detail for result in results):
+            return [
+                result if result.detail else result._replace(detail=BATCH_NOT_APPLIED)
+                for result in results
+            ]
+
+        ids = [
+            id
+            for index, result in enumerate(results)
+            if not result.detail
+            for id in (items[index].from_account_id, items[index].to_account_id)
+        ]
+        try:
+            async with accounts_controller.lock(*ids), self.transaction():
+                for index, result in enumerate(results):
+                    if result.detail:
+                        continue
+
+                    item = items[index]
+                    try:
+                        async with self.transaction():
+                            created = await self._apply(
+                                accounts[item.from_account_id],
+                                accounts[item.to_account_id],
+                                item.value,
+                                item.type,
+                            )
+                    except exceptions.TransactionException as exc:
+                        results[index] = result._replace(detail=exc.detail)
+                        if atomic:
+                            raise
+                        continue
+
+                    results[index] = result._replace(transaction=created)
+
+        except exceptions.TransactionException:
+            return [
+                result._replace(
+                    transaction=None, detail=result.detail or BATCH_NOT_APPLIED
                 )
-                await accounts_controller.update_(
-                    to_account.id,
-                    amount=to_account_amount,
+                for result in results
+            ]
+
+        return results
+
+    async def _apply(self, from_account, to_account, value, type) -> Record:
+        """creates the transaction, checks the funds and posts it to the ledger,
+        must run inside a database transaction holding the accounts locks"""
+        # writing first takes the SQLite write lock before reading the balances,
+        # so two transactions can't both read and then wait on each other to write
+        created = await self.create(  # type: ignore
+            returning=True,
+            from_account_id=from_account.id,
+            to_account_id=to_account.id,
+            value=value,  # type: ignore
+            type=type,  # type: ignore
+        )
+        balances = await self._ledger.balances({from_account.id, to_account.id})
+        sender = balances.get(from_account.id)
+        funds = sender.balance if sender is not None else Decimal("0")
+
+        if type == TransactionType.deposit:
+            entries = [(None, -value), (from_account.id, value)]
+
+        elif type == TransactionType.withdraw:
+            if funds < value:
+                raise exceptions.TransactionException("Insufficient funds to withdraw.")
+            entries = [(from_account.id, -value), (None, value)]
+
+        else:
+            if funds < value:
+                raise exceptions.TransactionException("Insufficient funds.")
+            if to_account.id not in balances:
+                raise exceptions.TransactionException(
+                    "the receiver account does not exists."
                 )
+            entries = [(from_account.id, -value), (to_account.id, value)]
 
-            else:
-                raise exceptions.TransactionException("Invalid transaction type.")
+        await self._ledger.post(created.id, entries, balances)  # type: ignore
+        return created  # type: ignore
 
-        return bool(created)
+    def _check_batch_item(
+        self, item: Any, accounts: Mapping[int, Any], owner_id: int | None
+    ) -> str | None:
+        """returns why the batch item is invalid, None if it is valid"""
+        from_account = accounts.get(item.from_account_id)
+        to_account = accounts.get(item.to_account_id)
+        if from_account is None or to_account is None:
+            return "the sender or receiver account id does not exists."
+
+        if owner_id is not None and from_account.user_id != owner_id:
+            return "You can only make a transaction from your own account"
+
+        if not isinstance(item.type, TransactionType):
+            return "Invalid transaction type."
+
+        try:
+            self.validate(from_account, to_account, item.value, item.type)
+        except exceptions.TransactionException as exc:
+            return exc.detail
+
+        return None
 
     def validate(self, from_account, to_account, value, type):
         """template method to call the validation methods. If some validation
@@ -2,15 +2,20 @@ from http import HTTPStatus
 from typing import Annotated, List
 
 from databases.interfaces import Record
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import select
 
 from .controllers import TransactionController
 from core.accounts.controllers import AccountController
 from core.auth.controllers import JWTController
+from core.streaming import StreamFormat, stream_records
 from core.users.controllers import UserController
-from .schemas import TransactionInSchema, TransactionOutSchema
+from .schemas import (
+    TransactionBatchInSchema,
+    TransactionBatchOutSchema,
+    TransactionInSchema,
+    TransactionOutSchema,
+)
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 jwt_ctrl = JWTController()
@@ -25,16 +30,25 @@ bearer = HTTPBearer()
 )
 async def list_transactions(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer)],
+    response: Response,
     limit: int = TransactionController.DEFAULT_LIMIT,
     offset: int = TransactionController.DEFAULT_OFFSET,
+    after: str | None = None,
+    stream: StreamFormat | None = None,
     transaction_ctrl: TransactionController = Depends(TransactionController),
 ) -> List[Record]:
-    """list all transactions. Only admin users can access.
+    """list all transactions. Only admin users can access. The cursor to the
+    next page is sent in the `X-Next-Cursor` header and the approximate total
+    in `X-Total-Count`. If `stream` is sent all the transactions are streamed
+    from the database cursor, without paging.
 
     Args:
         credentials (Annotated[HTTPAuthorizationCredentials, Depends): authorization header value.
+        response (Response): the response, used to set the pagination headers.
         limit (int, optional): the limit of transactions to show. Defaults to TransactionController.DEFAULT_LIMIT.
-        offset (int, optional): the offset to apply. Defaults to TransactionController.DEFAULT_OFFSET.
+        offset (int, optional): the offset to apply when no cursor is sent. Defaults to TransactionController.DEFAULT_OFFSET.
+        after (str | None, optional): the cursor of the next page. Defaults to None.
+        stream (StreamFormat | None, optional): `json` or `ndjson` to stream all the transactions. Defaults to None.
         transaction_ctrl (TransactionController, optional): the transactions controller. Defaults to Depends(TransactionController).
 
     Returns:
@@ -42,8 +56,17 @@ async def list_transactions(
     """
     jwt_ctrl.validate_token(credentials, required_roles="admin")
 
-    transactions = await transaction_ctrl.all(limit, offset)
-    return transactions
+    if stream is not None:
+        return stream_records(  # type: ignore
+            transaction_ctrl.iter_all(), TransactionOutSchema, stream
+        )
+
+    page = await transaction_ctrl.page(after, limit, offset=offset)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    total = await transaction_ctrl.count(approximate=True)
+    response.headers["X-Total-Count"] = str(total)
+    return page.records
 
 
 @router.get(
@@ -54,18 +77,23 @@ async def list_transactions(
 )
 async def list_account_transactions(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer)],
+    response: Response,
     limit: int = TransactionController.DEFAULT_LIMIT,
     offset: int = TransactionController.DEFAULT_OFFSET,
+    after: str | None = None,
     transaction_ctrl: TransactionController = Depends(TransactionController),
     account_ctrl: AccountController = Depends(AccountController),
     user_ctrl: UserController = Depends(UserController),
 ) -> List[Record]:
-    """list all transactions of the authenticated user.
+    """list all transactions of the authenticated user. The cursor to the next
+    page is sent in the `X-Next-Cursor` header and the approximate total in `X-Total-Count`.
 
     Args:
         credentials (Annotated[HTTPAuthorizationCredentials, Depends): the authorization header value.
+        response (Response): the response, used to set the pagination headers.
         limit (int, optional): the limit of transactions to show. Defaults to TransactionController.DEFAULT_LIMIT.
-        offset (int, optional): the offset to apply. Defaults to TransactionController.DEFAULT_OFFSET.
+        offset (int, optional): the offset to apply when no cursor is sent. Defaults to TransactionController.DEFAULT_OFFSET.
+        after (str | None, optional): the cursor of the next page. Defaults to None.
         transaction_ctrl (TransactionController, optional): the transaction controller instance. Defaults to Depends(TransactionController).
         account_ctrl (AccountController, optional): the accounts controller instance. Defaults to Depends(AccountController).
         user_ctrl (UserController, optional): the user controller instance. Defaults to Depends(UserController).
@@ -74,20 +102,16 @@ async def list_account_transactions(
         List[Record]: the list of the account transactions found
     """
     username = jwt_ctrl.validate_token(credentials)
-    user = await user_ctrl.get("username", username)
-    account = await account_ctrl.get("user_id", user.id)  # type: ignore
+    user = await user_ctrl.get("username", username, columns=["id"])
+    account = await account_ctrl.get("user_id", user.id, columns=["id"])  # type: ignore
 
-    stmt = (
-        select(transaction_ctrl.model)
-        .where(
-            transaction_ctrl.model.from_account_id == account.id  # type: ignore
-        )
-        .limit(limit)
-        .offset(offset)
-    )
-
-    transactions = await transaction_ctrl.query(stmt)
-    return transactions
+    where = transaction_ctrl.model.from_account_id == account.id  # type: ignore
+    page = await transaction_ctrl.page(after, limit, where=where, offset=offset)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    total = await transaction_ctrl.count(where, approximate=True)
+    response.headers["X-Total-Count"] = str(total)
+    return page.records
 
 
 @router.post(
@@ -129,7 +153,9 @@ async def create_transaction(
             detail="the sender or receiver account id does not exists.",
         )
 
-    user = await user_ctrl.get("id", from_account._mapping["user_id"])
+    user = await user_ctrl.get(
+        "id", from_account._mapping["user_id"], columns=["username"]
+    )
     if username != user._mapping["username"]:  # type: ignore
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN,
@@ -143,3 +169,70 @@ async def create_transaction(
         type=data.type,
         accounts_controller=account_ctrl,
     )
+
+
+@router.post(
+    "/batch",
+    status_code=HTTPStatus.CREATED,
+    response_model=TransactionBatchOutSchema,
+    summary="Registra um lote de transações.",
+    description="Valida todas as transações do lote e aplica as válidas em uma única transação do banco de dados, retornando o resultado de cada item. \
+        Com `atomic` nenhuma transação é aplicada se alguma falhar, caso contrário somente as que falharam são ignoradas. \
+        O usuário autenticado só pode criar transações para suas próprias contas.",
+)
+async def create_transaction_batch(
+    data: TransactionBatchInSchema,
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer)],
+    response: Response,
+    transaction_ctrl: TransactionController = Depends(TransactionController),
+    user_ctrl: UserController = Depends(UserController),
+    account_ctrl: AccountController = Depends(AccountController),
+):
+    """creates a batch of transactions. The token is validated once and all the
+    referenced accounts are loaded with a single query. The status code is 201
+    if all the items were applied, 422 if none and 207 if only some of them.
+
+    Args:
+        data (TransactionBatchInSchema): the transactions and if the batch is atomic.
+        credentials (Annotated[HTTPAuthorizationCredentials, Depends): authorization header value.
+        response (Response): the response, used to set the status code.
+        transaction_ctrl (TransactionController, optional): the transaction controller instance. Defaults to Depends(TransactionController).
+        user_ctrl (UserController, optional): the user controller instance. Defaults to Depends(UserController).
+        account_ctrl (AccountController, optional): the account controller instance. Defaults to Depends(AccountController).
+
+    Returns:
+        TransactionBatchOutSchema: the result of each item.
+    """
+    username = jwt_ctrl.validate_token(credentials)
+    user = await user_ctrl.get("username", username, columns=["id"])
+    if user is None:
+        raise HTTPException(
+            status_code=HTTPStatus.FORBIDDEN,
+            detail="You can only make a transaction from your own account",
+        )
+
+    ids = {item.from_account_id for item in data.items}
+    ids |= {item.to_account_id for item in data.items}
+    accounts = await account_ctrl.filter_by(
+        account_ctrl.model.id.in_(ids), limit=len(ids)
+    )
+
+    results = await transaction_ctrl.new_many(
+        data.items,
+        {account.id: account for account in accounts},
+        account_ctrl,
+        owner_id=user.id,
+        atomic=data.atomic,
+    )
+
+    created = sum(result.transaction is not None for result in results)
+    if created == 0:
+        response.status_code = HTTPStatus.UNPROCESSABLE_ENTITY
+    elif created < len(results):
+        response.status_code = HTTPStatus.MULTI_STATUS
+
+    return {
+        "atomic": data.atomic,
+        "created": created,
+        "results": [result._asdict() for result in results],
+    }
@@ -1,7 +1,9 @@
 from decimal import Decimal
-from typing import Annotated
+from typing import Annotated, List
 from pydantic import BaseModel, ConfigDict, AwareDatetime, NaiveDatetime
-from annotated_types import Gt
+from annotated_types import Gt, Len
+
+from core.domain_rules import domain_rules
 from .models import TransactionType
 
 
@@ -19,3 +21,26 @@ class TransactionOutSchema(TransactionInSchema):
     """Transaction output schema"""
     id: int
     time: AwareDatetime | NaiveDatetime
+
+
+class TransactionBatchInSchema(BaseModel):
+    """Transaction batch input schema"""
+    items: Annotated[
+        List[TransactionInSchema],
+        Len(1, domain_rules.transaction_rules.MAX_BATCH_SIZE),
+    ]
+    atomic: bool = True
+
+
+class TransactionBatchItemSchema(BaseModel):
+    """the result of one item of a transaction batch"""
+    index: int
+    transaction: TransactionOutSchema | None = None
+    detail: str | None = None
+
+
+class TransactionBatchOutSchema(BaseModel):
+    """Transaction batch output schema"""
+    atomic: bool
+    created: int
+    results: List[TransactionBatchItemSchema]
@@ -1,6 +1,9 @@
-from typing import Mapping, Any
+import asyncio
+from typing import Mapping, Any, Sequence
+from databases.interfaces import Record
 from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
+from core.database.cache import record_id
 from core.database.controller import DatabaseController
 from core.exceptions import DatabaseException
 from .models import User
@@ -9,18 +12,27 @@ from core.auth.controllers import PasswordController
 
 class UserController(DatabaseController):
     """controller to manager the user database operations"""
+
+    cache_enabled = True
+    batch_loads = True
+
     def __init__(self) -> None:
         super().__init__(model=User)
         self._pw_controller = PasswordController()
     
-    async def create(self, **mapping: Mapping[Any, Any]) -> int:
+    async def create(
+        self, *, returning: bool = False, **mapping: Mapping[Any, Any]
+    ) -> int | Record | None:
         """creates a new user hashing the password.
 
+        Args:
+            returning (bool, optional): if True the stored user is returned by the same statement. Defaults to False.
+
         Raises:
             DatabaseException: if some error of validation or with SQLAlchemy occur.
 
         Returns:
-            int: the number of rows affected in database
+            int | Record: the number of rows affected in database or the created user when `returning` is True
         """
         self._check_fields(list(mapping.keys()))
 
@@ -31,21 +43,62 @@ class UserController(DatabaseController):
             mapping['password'] = hashed_pw  # type: ignore
 
             stmt = insert(self._model)
-            return await self._db.execute(stmt, values=mapping)
+            if returning:
+                created = await self._db.fetch_one(
+                    stmt.returning(*self._model.__table__.columns), values=mapping
+                )
+            else:
+                created = await self._db.execute(stmt, values=mapping)
 
         except SQLAlchemyError as exc:
             raise DatabaseException("Creation fail.") from exc
 
-    async def update_(self, id: int, **mapping: Mapping) -> bool:
+        self._invalidate(record_id(created) if returning else created)
+        return created
+
+    async def create_many(
+        self,
+        rows: Sequence[Mapping[str, Any]],
+        chunk_size: int = DatabaseController.DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """creates many users at once. The passwords are validated raw and then
+        hashed concurrently in worker threads before the bulk insert.
+
+        Args:
+            rows (Sequence[Mapping[str, Any]]): the users data.
+            chunk_size (int, optional): the max number of rows per insert statement. Defaults to DatabaseController.DEFAULT_CHUNK_SIZE.
+
+        Raises:
+            BulkValidationException: some rows are invalid, nothing is created.
+            DatabaseException: if some error with SQLAlchemy occur.
+
+        Returns:
+            int: the number of created users
+        """
+        self._validate_many(rows)
+
+        hashes = await asyncio.gather(
+            *(
+                asyncio.to_thread(self._pw_controller.hash_password, row["password"])
+                for row in rows
+            )
+        )
+        hashed_rows = [{**row, "password": pw} for row, pw in zip(rows, hashes)]
+        return await self._insert_many(hashed_rows, chunk_size)
+
+    async def update_(
+        self, id: int, *, returning: bool = False, **mapping: Mapping
+    ) -> bool | Record | None:
         """updates the user with the given id. If password is in the mapping
         than it will be hashed before update.
 
         Args:
             id (int): the user id to be updated.
+            returning (bool, optional): if True the updated user is returned by the same statement. Defaults to False.
             mapping (Mapping): the mapping of fields and values to update.
 
         Returns:
-            bool: True if updated.
+            bool | Record: True if updated or the updated user when `returning` is True.
         """
         if not isinstance(id, int):
             return False
@@ -56,4 +109,4 @@ class UserController(DatabaseController):
             self.model(**mapping).validate_password()
             mapping['password'] = self._pw_controller.hash_password(pw)  # type: ignore
 
-        return await super().update_(id, **mapping)
+        return await super().update_(id, returning=returning, **mapping)
@@ -2,9 +2,9 @@ from http import HTTPStatus
 from typing import Annotated, List
 
 from databases.interfaces import Record
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import or_, select
+from sqlalchemy import or_
 
 from core.auth.controllers import JWTController, PasswordController
 
@@ -23,22 +23,31 @@ jwt_ctrl = JWTController()
     description="Retorna todos os usuários do banco de dados."
 )
 async def list_users(
+    response: Response,
     limit: int = UserController.DEFAULT_LIMIT,
     offset: int = UserController.DEFAULT_OFFSET,
+    after: str | None = None,
     ctrl: UserController = Depends(UserController),
 ) -> List[Record]:
-    """list all users from database.
+    """list all users from database. The cursor to the next page is sent in
+    the `X-Next-Cursor` header and the approximate total in `X-Total-Count`.
 
     Args:
+        response (Response): the response, used to set the pagination headers.
         limit (int, optional): the limit of users to show. Defaults to UserController.DEFAULT_LIMIT.
-        offset (int, optional): the offset to apply. Defaults to UserController.DEFAULT_OFFSET.
+        offset (int, optional): the offset to apply when no cursor is sent. Defaults to UserController.DEFAULT_OFFSET.
+        after (str | None, optional): the cursor of the next page. Defaults to None.
         ctrl (UserController, optional): the user controller instance. Defaults to Depends(UserController).
 
     Returns:
         List[Record]: the list of users from database.
     """
-    all_users = await ctrl.all(limit, offset)
-    return all_users
+    page = await ctrl.page(after, limit, offset=offset)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    total = await ctrl.count(approximate=True)
+    response.headers["X-Total-Count"] = str(total)
+    return page.records
 
 
 @router.get(
@@ -94,21 +103,19 @@ async def create_user(
     Returns:
         UserOutSchema: the created user.
     """
-    q = select(ctrl._model).where(
+    duplicated = await ctrl.exists(
         or_(
-            ctrl._model.cpf == user_data.cpf,
-            ctrl._model.username == user_data.username,
+            ctrl.model.cpf == user_data.cpf,
+            ctrl.model.username == user_data.username,
         )
     )
-    duplicated = await ctrl.query(q)
     if duplicated:
         raise HTTPException(
             HTTPStatus.UNPROCESSABLE_ENTITY,
             detail="Username of CPF are not available.",
         )
 
-    await ctrl.create(**user_data.model_dump())
-    created_user = await ctrl.get(where_field="cpf", equals_to=user_data.cpf)
+    created_user = await ctrl.create(returning=True, **user_data.model_dump())
     output = UserOutSchema.model_validate(created_user)
     return output
 
@@ -147,7 +154,7 @@ async def update_user(
     if not data:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Invalid data.")
 
-    user = await ctrl.get("id", id)
+    user = await ctrl.get("id", id, columns=["username"])
     username = jwt_ctrl.validate_token(credentials)
 
     if user is None or username != user._mapping["username"]:
@@ -156,9 +163,8 @@ async def update_user(
             detail="Invalid user id.",
         )
 
-    updated = await ctrl.update_(id, **data)
-    if updated:
-        updated_user = await ctrl.get(where_field="id", equals_to=id)
+    updated_user = await ctrl.update_(id, returning=True, **data)
+    if updated_user:
         output = UserOutSchema.model_validate(updated_user)
         return output
 
@@ -189,7 +195,7 @@ async def delete_user(
     Raises:
         HTTPException: No content status code only.
     """
-    user = await ctrl.get("id", id)
+    user = await ctrl.get("id", id, columns=["username"])
     username = jwt_ctrl.validate_token(credentials)
 
     if user is None or username != user._mapping["username"]:
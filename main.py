@@ -1,11 +1,18 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 from core.accounts import routes as account_routes
+from core.database import routes as database_routes
 from core.database.conf import DB
+from core.database.identity import IdentityMapMiddleware
+from core.database.instrumentation import QueryRouteMiddleware
 from core.exceptions import ValidationException
+from core.idempotency.controllers import sweep_expired_keys
+from core.idempotency.middleware import IdempotencyMiddleware
+from core.settings import settings
 from core.users import routes as user_routes
 from core.transactions import routes as transaction_routes
 from core.auth import routes as auth_routes
@@ -14,7 +21,11 @@ from core.auth import routes as auth_routes
 @asynccontextmanager
 async def lifespan(app):
     await DB.connect()
+    sweeper = asyncio.create_task(
+        sweep_expired_keys(settings.IDEMPOTENCY_SWEEP_INTERVAL)
+    )
     yield
+    sweeper.cancel()
     await DB.disconnect()
 
 
@@ -42,7 +53,12 @@ def validation_exception_handler(request: Request, exc: ValidationException):
     )
 
 
+api.add_middleware(IdempotencyMiddleware)
+api.add_middleware(IdentityMapMiddleware)
+api.add_middleware(QueryRouteMiddleware)
+
 api.include_router(user_routes.router)
 api.include_router(account_routes.router)
 api.include_router(transaction_routes.router)
 api.include_router(auth_routes.router)
+api.include_router(database_routes.router)
@@ -9,6 +9,8 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from core.accounts.models import Account, AccountType
 from core.auth.models import Role, UserRole
 from core.database.conf import Base
+from core.idempotency.models import IdempotencyKey
+from core.ledger.models import BalanceCheckpoint, Posting
 from core.settings import settings
 from core.transactions.models import Transaction
 from core.users.models import User
@@ -15,6 +15,8 @@ from core.users.models import User  # noqa: F401 , E402
 from core.accounts.models import AccountType, Account  # noqa: F401 , E402
 from core.transactions.models import Transaction, TransactionType  # noqa: F401 , E402
 from core.auth.models import Role, UserRole  # noqa: E402, F401
+from core.idempotency.models import IdempotencyKey  # noqa: E402, F401
+from core.ledger.models import BalanceCheckpoint, Posting  # noqa: E402, F401
 
 DUMB_USER_RAW_PW = "Dumbuser$123"
 
@@ -36,7 +38,12 @@ async def db_create():
 
 @pyt.fixture(autouse=True)
 async def db_clean(db_create):
-    """clean all tables data after each test function execution"""
+    """clean all tables data, the caches and the query stats after each test
+    function execution"""
+    from core.database.cache import count_cache, entity_caches
+    from core.database.instrumentation import query_stats
+    from core.idempotency.controllers import stored_responses
+
     for table in Base.metadata.sorted_tables:
         try:
             await DB.execute(f"DELETE FROM '{table.name}';")
@@ -44,6 +51,12 @@ async def db_clean(db_create):
         except Exception as e:
             print(f"Erro ao limpar a tabela {table.name}: {e}")
 
+    for cache in entity_caches().values():
+        cache.clear()
+    count_cache().clear()
+    stored_responses().clear()
+    query_stats().clear()
+
 
 @pyt.fixture
 async def client():
@@ -130,6 +143,15 @@ def account_type_ctrl():
     return ctrl
 
 
+@pyt.fixture
+def ledger_ctrl():
+    """return the ledger controller"""
+    from core.ledger.controllers import LedgerController
+
+    ctrl = LedgerController()
+    return ctrl
+
+
 @pyt.fixture
 def transaction_ctrl():
     """return the transaction controller"""
@@ -197,7 +197,7 @@ async def test_list_accounts_fail(
 ):
     """test list account types when validation exception raises"""
     mocker.patch(
-        "core.accounts.routes.AccountController.query",
+        "core.accounts.routes.AccountController.page",
         side_effect=DatabaseException('fail'),
     )
 
@@ -206,3 +206,17 @@ async def test_list_accounts_fail(
 
     assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
     assert resp_data['detail'] == 'fail'
+
+
+async def test_list_accounts_stream_json(
+    client, admin_token, five_dumb_accounts, accounts_ctrl
+):
+    """test list accounts streaming a JSON array"""
+    expected_ids = [acc.id for acc in await accounts_ctrl.all()]
+
+    response = await client.get(
+        "/accounts/", params={"stream": "json"}, headers=admin_token
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [d['id'] for d in response.json()] == expected_ids
@@ -70,7 +70,7 @@ async def test_list_account_types_fail(
 ):
     """test list account types when validation exception raises"""
     mocker.patch(
-        "core.accounts.routes.AccountTypeController.query",
+        "core.accounts.routes.AccountTypeController.page",
         side_effect=DatabaseException('fail'),
     )
 
@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+
+async def test_cache_stats_route(client, admin_token, accounts_ctrl, dumb_account):
+    await accounts_ctrl.get("id", dumb_account.id)
+    await accounts_ctrl.get("id", dumb_account.id)
+
+    response = await client.get("/database/cache", headers=admin_token)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["account"]["hits"] >= 1
+
+
+async def test_cache_stats_route_requires_admin(client, dumb_token):
+    response = await client.get("/database/cache", headers=dumb_token)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def test_queries_stats_route_attributes_the_route(client, admin_token):
+    await client.get("/users/", headers=admin_token)
+
+    response = await client.get("/database/queries", headers=admin_token)
+
+    assert response.status_code == HTTPStatus.OK
+    routes = [route for stats in response.json().values() for route in stats["routes"]]
+    assert "GET /users/" in routes
+
+
+async def test_queries_stats_route_requires_admin(client, dumb_token):
+    response = await client.get("/database/queries", headers=dumb_token)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def test_locks_stats_route(client, admin_token, dumb_token, dumb_account):
+    deposit = {
+        "from_account_id": dumb_account.id,
+        "to_account_id": dumb_account.id,
+        "value": 10,
+        "type": "deposit",
+    }
+    await client.post("/transactions/", json=deposit, headers=dumb_token)
+
+    response = await client.get("/database/locks", headers=admin_token)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["account"]["acquisitions"] >= 1
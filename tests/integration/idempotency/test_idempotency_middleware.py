@@ -0,0 +1,68 @@
+import asyncio
+from http import HTTPStatus
+
+
+def deposit(account_id, value=10):
+    return {
+        "from_account_id": account_id,
+        "to_account_id": account_id,
+        "value": value,
+        "type": "deposit",
+    }
+
+
+async def test_retry_returns_the_stored_response(
+    client, dumb_token, dumb_account, transaction_ctrl, mocker
+):
+    new = mocker.spy(transaction_ctrl.__class__, "new")
+    headers = {**dumb_token, "Idempotency-Key": "retry-1"}
+
+    first = await client.post("/transactions/", json=deposit(dumb_account.id), headers=headers)
+    retry = await client.post("/transactions/", json=deposit(dumb_account.id), headers=headers)
+
+    assert first.status_code == retry.status_code == HTTPStatus.CREATED
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert await transaction_ctrl.count() == 1
+    assert new.call_count == 1
+
+
+async def test_concurrent_duplicates_run_once(
+    client, dumb_token, dumb_account, transaction_ctrl
+):
+    headers = {**dumb_token, "Idempotency-Key": "concurrent-1"}
+
+    responses = await asyncio.gather(
+        *(
+            client.post("/transactions/", json=deposit(dumb_account.id), headers=headers)
+            for _ in range(5)
+        )
+    )
+
+    assert {response.status_code for response in responses} == {HTTPStatus.CREATED}
+    assert await transaction_ctrl.count() == 1
+
+
+async def test_key_reused_with_other_body(client, dumb_token, dumb_account):
+    headers = {**dumb_token, "Idempotency-Key": "reused-1"}
+    await client.post("/transactions/", json=deposit(dumb_account.id), headers=headers)
+
+    response = await client.post(
+        "/transactions/", json=deposit(dumb_account.id, 20), headers=headers
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json() == {
+        "detail": "Idempotency-Key already used with a different request."
+    }
+
+
+async def test_requests_without_key_are_not_deduplicated(
+    client, dumb_token, dumb_account, transaction_ctrl
+):
+    for _ in range(2):
+        await client.post(
+            "/transactions/", json=deposit(dumb_account.id), headers=dumb_token
+        )
+
+    assert await transaction_ctrl.count() == 2
@@ -1,8 +1,12 @@
+import json
 from decimal import Decimal
 from http import HTTPStatus
 
 import pytest
 
+from core.accounts.controllers import AccountController
+from core.accounts.models import Account
+from core.database.instrumentation import fingerprint, query_stats
 from core.domain_rules import domain_rules
 
 
@@ -19,6 +23,24 @@ async def test_create_transaction_deposit_success(
     assert response.status_code == HTTPStatus.CREATED
 
 
+async def test_create_transaction_loads_the_account_once_per_request(
+    client, dumb_token, dumb_account, monkeypatch
+):
+    monkeypatch.setattr(AccountController, "cache_enabled", False)
+    monkeypatch.setattr(AccountController, "batch_loads", False)
+    data = {
+        "from_account_id": dumb_account.id, "to_account_id": dumb_account.id,
+        "value": 10, "type": "deposit"
+    }
+
+    response = await client.post("/transactions/", json=data, headers=dumb_token)
+
+    stmt = AccountController()._select().where(Account.id == dumb_account.id)
+    key, _ = fingerprint(stmt)
+    assert response.status_code == HTTPStatus.CREATED
+    assert query_stats().get(key).routes == {"POST /transactions/": 1}
+
+
 @pytest.mark.parametrize(
     "to_id,value",
     [
@@ -233,3 +255,107 @@ async def test_list_account_transactions_success(client, five_dumb_transactions,
     assert response.status_code == HTTPStatus.OK
     assert len(resp_data) == expect_len
     assert unique_ids == {1}
+
+
+async def test_list_transactions_next_cursor(client, five_dumb_transactions, admin_token):
+    response = await client.get(
+        "/transactions/", params={"limit": 3}, headers=admin_token
+    )
+    cursor = response.headers["X-Next-Cursor"]
+
+    next_response = await client.get(
+        "/transactions/", params={"limit": 3, "after": cursor}, headers=admin_token
+    )
+
+    assert [d["id"] for d in response.json()] == [1, 2, 3]
+    assert [d["id"] for d in next_response.json()] == [4, 5]
+    assert "X-Next-Cursor" not in next_response.headers
+    assert response.headers["X-Total-Count"] == "5"
+
+
+async def test_list_transactions_stream_ndjson(client, five_dumb_transactions, admin_token):
+    response = await client.get(
+        "/transactions/", params={"stream": "ndjson"}, headers=admin_token
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [line["id"] for line in lines] == [1, 2, 3, 4, 5]
+
+
+def batch_transfers(from_id, values, to_ids, atomic=True):
+    return {
+        "atomic": atomic,
+        "items": [
+            {
+                "from_account_id": from_id,
+                "to_account_id": to_id,
+                "value": value,
+                "type": "transference",
+            }
+            for value, to_id in zip(values, to_ids)
+        ],
+    }
+
+
+async def test_create_transaction_batch_success(
+    client, two_dumb_accounts_10amount, accounts_ctrl, dumb_account_10amount, dumb_token
+):
+    data = batch_transfers(dumb_account_10amount.id, [4, 6], [2, 1])
+
+    response = await client.post("/transactions/batch", json=data, headers=dumb_token)
+    resp_data = response.json()
+    from_ = await accounts_ctrl.get("id", dumb_account_10amount.id)
+
+    account_selects = [
+        stats["routes"].get("POST /transactions/batch", 0)
+        for stats in query_stats().stats().values()
+        if stats["statement"].startswith("SELECT account.id, account.number")
+    ]
+    assert response.status_code == HTTPStatus.CREATED
+    assert resp_data["created"] == 2
+    assert [r["transaction"]["value"] for r in resp_data["results"]] == ["4.00", "6.00"]
+    assert from_.amount == Decimal("0")
+    assert sum(account_selects) == 1
+
+
+async def test_create_transaction_batch_atomic_applies_nothing_on_failure(
+    client, two_dumb_accounts_10amount, accounts_ctrl, dumb_account_10amount, dumb_token
+):
+    data = batch_transfers(dumb_account_10amount.id, [6, 6], [2, 1])
+
+    response = await client.post("/transactions/batch", json=data, headers=dumb_token)
+    resp_data = response.json()
+    from_ = await accounts_ctrl.get("id", dumb_account_10amount.id)
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert resp_data["created"] == 0
+    assert [r["detail"] for r in resp_data["results"]] == [
+        "not applied, other item of the batch failed.",
+        "Insufficient funds.",
+    ]
+    assert from_.amount == Decimal("10")
+
+
+async def test_create_transaction_batch_best_effort(
+    client, two_dumb_accounts_10amount, accounts_ctrl, dumb_account_10amount, dumb_token
+):
+    data = batch_transfers(dumb_account_10amount.id, [6, 6, 3], [2, 1, 1], atomic=False)
+    data["items"].append(
+        {"from_account_id": 1, "to_account_id": 2, "value": 1, "type": "transference"}
+    )
+
+    response = await client.post("/transactions/batch", json=data, headers=dumb_token)
+    resp_data = response.json()
+    from_ = await accounts_ctrl.get("id", dumb_account_10amount.id)
+
+    assert response.status_code == HTTPStatus.MULTI_STATUS
+    assert resp_data["created"] == 2
+    assert [r["detail"] for r in resp_data["results"]] == [
+        None,
+        "Insufficient funds.",
+        None,
+        "You can only make a transaction from your own account",
+    ]
+    assert from_.amount == Decimal("1")
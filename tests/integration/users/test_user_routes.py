@@ -33,10 +33,11 @@ async def test_list_users_limit_offset(client, five_dumb_users):
 
     assert response.status_code == HTTPStatus.OK
     assert expected_user_ids == sorted(resp_user_ids)
+    assert response.headers['X-Total-Count'] == '5'
 
 
 async def test_list_users_when_validation_exception_raises(client, mocker):
-    mocker.patch('core.users.routes.UserController.all', side_effect=DatabaseException('exception'))
+    mocker.patch('core.users.routes.UserController.page', side_effect=DatabaseException('exception'))
 
     response = await client.get('/users/')
     resp_data = response.json()
@@ -144,7 +145,7 @@ async def test_create_user_when_validation_exception_raises(client, mocker):
         'cpf': '135.339.740-81',
         'birthdate': '2005-03-11',
     }
-    mocker.patch('core.users.routes.UserController.query', side_effect=DatabaseException('exception'))
+    mocker.patch('core.users.routes.UserController.exists', side_effect=DatabaseException('exception'))
 
     response = await client.post('/users/', json=data)
     resp_data = response.json()
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.database.loader import BatchLoader
+from core.exceptions import DatabaseException
+from core.users.models import User
+
+
+async def test_concurrent_gets_are_loaded_with_one_query(
+    user_ctrl, five_dumb_users, mocker
+):
+    user_ctrl._cache = None
+    users = await user_ctrl.all()
+    fetch_all = mocker.spy(user_ctrl._db.database, "fetch_all")
+    fetch_one = mocker.spy(user_ctrl._db.database, "fetch_one")
+
+    found = await asyncio.gather(
+        *(user_ctrl.get("id", user.id) for user in users),
+        user_ctrl.get("id", users[0].id),
+        user_ctrl.get("id", 999),
+    )
+
+    assert [user.id for user in found[:5]] == [user.id for user in users]
+    assert found[5].id == users[0].id
+    assert found[6] is None
+    fetch_all.assert_called_once()
+    fetch_one.assert_not_called()
+
+
+async def test_batch_loader_splits_the_values_in_max_batch(
+    user_ctrl, five_dumb_users, mocker
+):
+    loader = BatchLoader(user_ctrl._db, User, "id", max_batch=2)
+    fetch_all = mocker.spy(user_ctrl._db, "fetch_all")
+
+    found = await asyncio.gather(*(loader.load(id) for id in range(1, 6)))
+
+    assert len([user for user in found if user is not None]) == 5
+    assert fetch_all.call_count == 3
+    assert loader.stats() == {"loads": 5, "batches": 3}
+
+
+async def test_get_does_not_batch_projections_or_not_unique_fields(
+    accounts_ctrl, dumb_account, mocker
+):
+    accounts_ctrl._cache = None
+    fetch_one = mocker.spy(accounts_ctrl._db, "fetch_one")
+
+    await asyncio.gather(
+        accounts_ctrl.get("id", dumb_account.id, columns=["amount"]),
+        accounts_ctrl.get("user_id", dumb_account.user_id),
+    )
+
+    assert fetch_one.call_count == 2
+
+
+async def test_batch_errors_are_raised_to_every_caller(user_ctrl, dumb_user, mocker):
+    user_ctrl._cache = None
+    mocker.patch.object(
+        user_ctrl._db.database, "fetch_all", side_effect=SQLAlchemyError
+    )
+
+    results = await asyncio.gather(
+        user_ctrl.get("id", dumb_user.id),
+        user_ctrl.get("username", dumb_user.username),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, DatabaseException) for result in results)
@@ -6,7 +6,7 @@ from sqlalchemy import select, insert, update, delete
 from sqlalchemy.exc import SQLAlchemyError
 
 from core.users.models import User
-from core.exceptions import DatabaseException
+from core.exceptions import BulkValidationException, DatabaseException
 
 
 async def test_get_success(db_ctrl, dumb_user):
@@ -287,4 +287,265 @@ def test_raise_attr_error_if_model_is_no_sent(db_ctrl):
 
 def test_model_property_return_the_model_attr(db_ctrl):
     ctrl = db_ctrl(User)
-    assert ctrl.model is ctrl._model
\ No newline at end of file
+    assert ctrl.model is ctrl._model
+
+async def test_page_return_first_page_and_next_cursor(db_ctrl, five_dumb_users):
+    page = await db_ctrl(User).page(limit=2)
+
+    assert [r.id for r in page.records] == [1, 2]
+    assert page.next_cursor is not None
+
+
+async def test_page_follows_the_cursor_until_the_last_page(db_ctrl, five_dumb_users):
+    ctrl = db_ctrl(User)
+    ids, cursor = [], None
+    while True:
+        page = await ctrl.page(cursor, limit=2)
+        ids.extend(r.id for r in page.records)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert ids == [1, 2, 3, 4, 5]
+
+
+async def test_page_with_composite_order_by(db_ctrl, five_dumb_transactions):
+    from core.transactions.models import Transaction
+
+    ctrl = db_ctrl(Transaction)
+    first = await ctrl.page(limit=3, order_by=("time", "id"))
+    second = await ctrl.page(first.next_cursor, limit=3, order_by=("time", "id"))
+
+    assert [r.id for r in first.records] == [1, 2, 3]
+    assert [r.id for r in second.records] == [4, 5]
+    assert second.next_cursor is None
+
+
+async def test_page_with_where_clause(db_ctrl, five_dumb_users):
+    page = await db_ctrl(User).page(limit=10, where=User.id > 3)
+
+    assert [r.id for r in page.records] == [4, 5]
+    assert page.next_cursor is None
+
+
+async def test_page_uses_offset_only_without_cursor(db_ctrl, five_dumb_users):
+    ctrl = db_ctrl(User)
+    first = await ctrl.page(limit=2, offset=1)
+    second = await ctrl.page(first.next_cursor, limit=2, offset=1)
+
+    assert [r.id for r in first.records] == [2, 3]
+    assert [r.id for r in second.records] == [4, 5]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzEsMl0"])
+async def test_page_raises_database_exception_with_invalid_cursor(
+    db_ctrl, five_dumb_users, cursor
+):
+    with pytest.raises(DatabaseException) as exc:
+        await db_ctrl(User).page(cursor)
+
+    assert exc.value.detail == "Invalid cursor."
+    assert exc.value.code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+async def test_create_many_success(db_ctrl):
+    from core.auth.models import Role
+
+    rows = [{"name": f"role{i}"} for i in range(5)]
+    created = await db_ctrl(Role).create_many(rows, chunk_size=2)
+    roles = await db_ctrl(Role).all()
+
+    assert created == 5
+    assert [r.name for r in roles] == [f"role{i}" for i in range(5)]
+
+
+async def test_create_many_reports_invalid_rows_and_creates_nothing(db_ctrl):
+    valid = {
+        "username": "test",
+        "password": "Test@123",
+        "first_name": "test",
+        "last_name": "test",
+        "cpf": "422.961.160-94",
+        "birthdate": date(2005, 3, 11),
+    }
+    rows = [
+        valid,
+        {**valid, "username": "other", "cpf": "111.111.111-11"},
+        {**valid, "username": "another", "password": "weak"},
+        {"username": "missing"},
+    ]
+
+    with pytest.raises(BulkValidationException) as exc:
+        await db_ctrl(User).create_many(rows)
+
+    assert exc.value.errors == [
+        (1, "Invalid CPF"),
+        (2, "Password too weak."),
+        (3, "the fields differ from the first row."),
+    ]
+    assert exc.value.code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert await db_ctrl(User).all() == []
+
+
+async def test_create_many_raises_database_exception_when_sqlalchemy_error_occur(
+    db_ctrl, mocker
+):
+    from core.auth.models import Role
+
+    mocker.patch("core.database.controller.insert", side_effect=SQLAlchemyError)
+
+    with pytest.raises(DatabaseException) as exc:
+        await db_ctrl(Role).create_many([{"name": "role"}])
+
+    assert exc.value.detail == "Creation fail."
+    assert exc.value.code == HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+async def test_create_returning_return_the_stored_row(db_ctrl):
+    created = await db_ctrl(User).create(
+        returning=True,
+        username="test",
+        password="Test@123",
+        first_name="test",
+        last_name="test",
+        cpf="422.961.160-94",
+        birthdate=date(2005, 3, 11),
+    )
+    stored = await db_ctrl(User).get("username", "test")
+
+    assert dict(created._mapping) == dict(stored._mapping)
+
+
+async def test_update_returning_return_the_updated_row(db_ctrl, dumb_user):
+    updated = await db_ctrl(User).update_(
+        dumb_user.id, returning=True, username="updated_username"
+    )
+    stored = await db_ctrl(User).get("id", dumb_user.id)
+
+    assert updated.username == "updated_username"
+    assert dict(updated._mapping) == dict(stored._mapping)
+
+
+async def test_update_returning_return_none_with_invalid_id(db_ctrl, dumb_user):
+    updated = await db_ctrl(User).update_(5, returning=True, username="updated")
+
+    assert updated is None
+
+
+async def test_iter_all_streams_all_registries(db_ctrl, five_dumb_users):
+    ids = [user.id async for user in db_ctrl(User).iter_all()]
+
+    assert ids == [1, 2, 3, 4, 5]
+
+
+async def test_iter_all_with_where_and_chunk_size(db_ctrl, five_dumb_users):
+    chunks = [
+        [user.id for user in chunk]
+        async for chunk in db_ctrl(User).iter_all(User.id > 1, chunk_size=3)
+    ]
+
+    assert chunks == [[2, 3, 4], [5]]
+
+
+async def test_get_with_columns_return_only_the_columns(db_ctrl, dumb_user):
+    """test if get fetches only the projected columns"""
+    user = await db_ctrl(User).get("id", dumb_user.id, columns=["id", "username"])
+
+    assert dict(user) == {"id": dumb_user.id, "username": dumb_user.username}
+
+
+async def test_get_with_invalid_column(db_ctrl, dumb_user):
+    """test if get raises DatabaseException when a projected column does not exists"""
+    with pytest.raises(DatabaseException) as exc:
+        await db_ctrl(User).get("id", dumb_user.id, columns=["invalid"])
+
+    assert exc.value.detail == f"`{User.__tablename__}` has no field `invalid`."
+
+
+async def test_all_with_columns_return_only_the_columns(db_ctrl, five_dumb_users):
+    """test if all fetches only the projected columns"""
+    users = await db_ctrl(User).all(columns=["username"])
+
+    assert len(users) == 5
+    assert all(list(user.keys()) == ["username"] for user in users)
+
+
+async def test_filter_by_return_the_matching_registries(db_ctrl, five_dumb_users):
+    """test if filter_by returns the registries matching all the criteria"""
+    ctrl = db_ctrl(User)
+    expected = (await ctrl.all())[2]
+
+    users = await ctrl.filter_by(
+        columns=["id"], username=expected.username, cpf=expected.cpf
+    )
+
+    assert [dict(user) for user in users] == [{"id": expected.id}]
+
+
+async def test_filter_by_with_invalid_field(db_ctrl, five_dumb_users):
+    """test if filter_by raises DatabaseException with an invalid criteria field"""
+    with pytest.raises(DatabaseException):
+        await db_ctrl(User).filter_by(invalid=1)
+
+
+async def test_filter_by_raises_database_exception_when_sqlalchemy_error_occur(
+    db_ctrl, five_dumb_users, mocker
+):
+    """test if filter_by raises DatabaseException when the database fails"""
+    mocker.patch("core.database.controller.select", side_effect=SQLAlchemyError)
+
+    with pytest.raises(DatabaseException) as exc:
+        await db_ctrl(User).filter_by(id=1)
+
+    assert exc.value.detail == "Error fetching data."
+
+
+async def test_exists(db_ctrl, five_dumb_users):
+    """test if exists checks the criteria and the where clauses"""
+    ctrl = db_ctrl(User)
+    user = (await ctrl.all())[0]
+
+    assert await ctrl.exists(username=user.username)
+    assert await ctrl.exists(User.id > 4)
+    assert not await ctrl.exists(User.id > 4, username=user.username)
+    assert not await ctrl.exists(username="missing")
+
+
+async def test_exists_does_not_fetch_the_registry(db_ctrl, dumb_user, mocker):
+    """test if exists selects a constant limited to one row"""
+    ctrl = db_ctrl(User)
+    fetch_one = mocker.spy(ctrl._db, "fetch_one")
+
+    await ctrl.exists(id=dumb_user.id)
+
+    sql = str(fetch_one.call_args.args[0])
+    assert sql.startswith("SELECT :param_1")
+    assert "LIMIT" in sql
+
+
+async def test_count(db_ctrl, five_dumb_users):
+    """test if count returns the number of registries matching"""
+    ctrl = db_ctrl(User)
+
+    assert await ctrl.count() == 5
+    assert await ctrl.count(User.id > 3) == 2
+    assert await ctrl.count(id=1) == 1
+
+
+async def test_count_approximate_is_cached(db_ctrl, five_dumb_users, mocker):
+    """test if the approximate count reuses the last count of the same criteria"""
+    ctrl = db_ctrl(User)
+    assert await ctrl.count(approximate=True) == 5
+    await ctrl.delete_(1)
+    fetch_val = mocker.spy(ctrl._db, "fetch_val")
+
+    assert await ctrl.count(approximate=True) == 5
+    assert await ctrl.count(id=2, approximate=True) == 1
+    assert await ctrl.count() == 4
+    assert fetch_val.call_count == 2
+
+
+async def test_count_with_invalid_field(db_ctrl, five_dumb_users):
+    """test if count raises DatabaseException with an invalid criteria field"""
+    with pytest.raises(DatabaseException):
+        await db_ctrl(User).count(invalid=1)
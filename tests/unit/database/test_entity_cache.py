@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+from core.database.cache import EntityCache, TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries(mocker):
+    cache = TTLCache(maxsize=2, ttl=5)
+    monotonic = mocker.patch("core.database.cache.time.monotonic", return_value=100)
+    cache.set("a", 1)
+    monotonic.return_value = 106
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_counts_hits_and_misses():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+async def test_entity_cache_invalidate_drops_every_key_of_the_id(user_ctrl, dumb_user):
+    cache = EntityCache("user", maxsize=10, ttl=60)
+    cache.set_record("id", dumb_user.id, dumb_user)
+    cache.set_record("username", dumb_user.username, dumb_user)
+
+    cache.invalidate(dumb_user.id)
+
+    assert cache.get_record("id", dumb_user.id) is None
+    assert cache.get_record("username", dumb_user.username) is None
+
+
+async def test_get_reads_through_the_cache(accounts_ctrl, dumb_account, mocker):
+    await accounts_ctrl.get("id", dumb_account.id)
+    fetch_one = mocker.spy(accounts_ctrl._db, "fetch_one")
+
+    account = await accounts_ctrl.get("id", dumb_account.id)
+
+    assert account.id == dumb_account.id
+    fetch_one.assert_not_called()
+
+
+async def test_update_invalidates_the_cached_registry(accounts_ctrl, dumb_account):
+    await accounts_ctrl.get("id", dumb_account.id)
+    await accounts_ctrl.update_(dumb_account.id, amount=Decimal("15"))
+
+    account = await accounts_ctrl.get("id", dumb_account.id)
+
+    assert account.amount == Decimal("15")
+
+
+async def test_delete_invalidates_the_cached_registry(user_ctrl, dumb_user):
+    await user_ctrl.get("username", dumb_user.username)
+    await user_ctrl.delete_(dumb_user.id)
+
+    assert await user_ctrl.get("username", dumb_user.username) is None
+
+
+async def test_get_bypasses_the_cache_inside_transactions(
+    accounts_ctrl, dumb_account, mocker
+):
+    await accounts_ctrl.get("id", dumb_account.id)
+    fetch_one = mocker.spy(accounts_ctrl._db, "fetch_one")
+
+    async with accounts_ctrl.transaction():
+        await accounts_ctrl.get("id", dumb_account.id)
+
+    fetch_one.assert_called_once()
+
+
+
+async def test_get_with_columns_does_not_cache_the_partial_registry(
+    accounts_ctrl, dumb_account
+):
+    accounts_ctrl._cache.clear()
+    await accounts_ctrl.get("id", dumb_account.id, columns=["id"])
+
+    account = await accounts_ctrl.get("id", dumb_account.id)
+
+    assert account.amount == dumb_account.amount
@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+from core.database.identity import IdentityMap, current_identity_map, identity_map
+
+
+async def test_identity_map_invalidate_drops_every_key_of_the_id(dumb_user):
+    identities = IdentityMap()
+    identities.add("user", "id", dumb_user.id, dumb_user)
+    identities.add("user", "username", dumb_user.username, dumb_user)
+
+    identities.invalidate("user", dumb_user.id)
+
+    assert identities.get("user", "id", dumb_user.id) is None
+    assert len(identities) == 0
+
+
+def test_identity_map_is_bound_only_inside_the_block():
+    with identity_map() as identities:
+        assert current_identity_map() is identities
+
+    assert current_identity_map() is None
+
+
+async def test_get_loads_the_registry_once_per_identity_map(
+    account_type_ctrl, dumb_account_type, mocker
+):
+    fetch_one = mocker.spy(account_type_ctrl._db, "fetch_one")
+
+    with identity_map():
+        first = await account_type_ctrl.get("id", dumb_account_type.id)
+        second = await account_type_ctrl.get("id", dumb_account_type.id)
+        projected = await account_type_ctrl.get(
+            "id", dumb_account_type.id, columns=["type"]
+        )
+
+    assert first is second is projected
+    fetch_one.assert_called_once()
+
+
+async def test_update_drops_the_loaded_registry(accounts_ctrl, dumb_account):
+    with identity_map():
+        await accounts_ctrl.get("id", dumb_account.id)
+        await accounts_ctrl.update_(dumb_account.id, amount=Decimal("15"))
+
+        account = await accounts_ctrl.get("id", dumb_account.id)
+
+    assert account.amount == Decimal("15")
+
+
+async def test_get_bypasses_the_identity_map_inside_transactions(
+    account_type_ctrl, dumb_account_type, mocker
+):
+    fetch_one = mocker.spy(account_type_ctrl._db, "fetch_one")
+
+    with identity_map() as identities:
+        async with account_type_ctrl.transaction():
+            await account_type_ctrl.get("id", dumb_account_type.id)
+            await account_type_ctrl.get("id", dumb_account_type.id)
+
+    assert fetch_one.call_count == 2
+    assert len(identities) == 0
@@ -0,0 +1,65 @@
+import logging
+
+from sqlalchemy import insert, select
+
+from core.database.instrumentation import (
+    QueryMetric,
+    fingerprint,
+    query_stats,
+)
+from core.settings import settings
+from core.users.models import User
+
+
+def test_fingerprint_ignores_the_bound_values():
+    first, _ = fingerprint(select(User).where(User.id == 1))
+    second, _ = fingerprint(select(User).where(User.id == 2))
+
+    assert first == second
+    assert first != fingerprint(select(User).where(User.username == "a"))[0]
+
+
+def test_fingerprint_is_the_same_for_multi_row_inserts_of_any_size():
+    row = {"username": "a", "password": "b"}
+    two, statement = fingerprint(insert(User).values([row, row]))
+    three, _ = fingerprint(insert(User).values([row, row, row]))
+
+    assert two == three
+    assert statement.endswith("VALUES (:username_m, :password_m), ...")
+
+
+def test_query_metric_percentiles():
+    metric = QueryMetric("SELECT 1", samples=100)
+    for duration in range(1, 101):
+        metric.observe(float(duration), rows=1, route=None)
+
+    assert metric.percentile(50) == 50
+    assert metric.percentile(95) == 95
+    assert metric.percentile(99) == 99
+    assert metric.stats()["count"] == 100
+
+
+async def test_controller_statements_are_measured(user_ctrl, five_dumb_users):
+    query_stats().clear()
+
+    await user_ctrl.all()
+    await user_ctrl.get("id", 1, columns=["id"])
+
+    stats = query_stats().stats()
+    key, _ = fingerprint(select(User).offset(0).limit(1000))
+    assert stats[key]["count"] == 1
+    assert stats[key]["rows"] == 5
+    assert len(stats) == 2
+
+
+async def test_slow_queries_are_logged_without_the_values(
+    user_ctrl, dumb_user, monkeypatch, caplog
+):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+
+    with caplog.at_level(logging.WARNING, logger="core.database.queries"):
+        await user_ctrl.get("username", dumb_user.username, columns=["id"])
+
+    assert "slow query" in caplog.text
+    assert "'username_1': 'str'" in caplog.text
+    assert dumb_user.username not in caplog.text
@@ -0,0 +1,72 @@
+import asyncio
+import gc
+
+from core.database.locks import LockManager, lock_manager
+
+
+async def test_acquire_serializes_the_same_key():
+    locks = LockManager("test")
+    events = []
+
+    async def work(name):
+        async with locks.acquire(1):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+
+    await asyncio.gather(work("a"), work("b"))
+
+    assert events == ["a start", "a end", "b start", "b end"]
+    assert locks.stats()["contentions"] == 1
+    assert locks.stats()["max_wait_ms"] > 0
+
+
+async def test_acquire_in_opposite_orders_does_not_deadlock():
+    locks = LockManager("test")
+
+    async def transfer(from_id, to_id):
+        async with locks.acquire(from_id, to_id):
+            await asyncio.sleep(0)
+
+    await asyncio.wait_for(
+        asyncio.gather(*(transfer(1, 2) if i % 2 else transfer(2, 1) for i in range(20))),
+        timeout=1,
+    )
+
+    assert locks.stats()["acquisitions"] == 40
+
+
+async def test_acquire_repeated_key_locks_once():
+    locks = LockManager("test")
+
+    async with locks.acquire(1, 1):
+        assert locks.lock(1).locked()
+
+    assert locks.stats()["acquisitions"] == 1
+
+
+async def test_idle_locks_are_released():
+    locks = LockManager("test")
+
+    async with locks.acquire(*range(100)):
+        assert len(locks) == 100
+
+    gc.collect()
+    assert len(locks) == 0
+
+
+async def test_acquire_releases_on_error():
+    locks = LockManager("test")
+
+    try:
+        async with locks.acquire(1, 2):
+            raise RuntimeError
+    except RuntimeError:
+        pass
+
+    assert not locks.lock(1).locked()
+    assert not locks.lock(2).locked()
+
+
+def test_lock_manager_is_shared_by_name():
+    assert lock_manager("account") is lock_manager("account")
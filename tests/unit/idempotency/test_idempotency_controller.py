@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from core.idempotency.controllers import (
+    IdempotencyController,
+    StoredResponse,
+    stored_responses,
+)
+from core.settings import settings
+
+RESPONSE = StoredResponse("hash", 201, "application/json", b'{"id": 1}')
+
+
+async def test_save_and_load():
+    ctrl = IdempotencyController()
+    await ctrl.save("key", RESPONSE)
+    stored_responses().clear()
+
+    assert await ctrl.load("key") == RESPONSE
+    assert await ctrl.load("other") is None
+
+
+async def test_save_keeps_the_first_response():
+    ctrl = IdempotencyController()
+    await ctrl.save("key", RESPONSE)
+    await ctrl.save("key", RESPONSE._replace(status_code=500))
+    stored_responses().clear()
+
+    assert (await ctrl.load("key")).status_code == 201
+
+
+async def test_sweep_deletes_only_the_expired_keys(monkeypatch):
+    ctrl = IdempotencyController()
+    monkeypatch.setattr(settings, "IDEMPOTENCY_TTL", -1)
+    await ctrl.save("expired", RESPONSE)
+    monkeypatch.setattr(settings, "IDEMPOTENCY_TTL", timedelta(days=1).total_seconds())
+    await ctrl.save("valid", RESPONSE)
+    stored_responses().clear()
+
+    assert await ctrl.sweep() == 1
+    assert await ctrl.load("expired") is None
+    assert await ctrl.load("valid") == RESPONSE
@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from core.exceptions import DatabaseException
+from core.ledger.models import BalanceCheckpoint, Posting
+from core.settings import settings
+
+
+async def test_first_posting_opens_the_account_balance(
+    dumb_account_10amount, ledger_ctrl
+):
+    id = dumb_account_10amount.id
+
+    balances = await ledger_ctrl.post(None, [(None, Decimal("-5")), (id, Decimal("5"))])
+
+    postings = await ledger_ctrl.query(select(Posting).order_by(Posting.id))
+    assert balances == {id: Decimal("15")}
+    assert [(p.transaction_id, p.account_id, p.amount) for p in postings] == [
+        (None, id, Decimal("10")),
+        (None, None, Decimal("-10")),
+        (None, None, Decimal("-5")),
+        (None, id, Decimal("5")),
+    ]
+    assert (await ledger_ctrl.balances([id]))[id].balance == Decimal("15")
+
+
+async def test_post_does_not_update_the_account_before_the_checkpoint(
+    dumb_account, ledger_ctrl, accounts_ctrl
+):
+    id = dumb_account.id
+    await ledger_ctrl.post(None, [(None, Decimal("-5")), (id, Decimal("5"))])
+
+    stored = await accounts_ctrl.query(
+        select(accounts_ctrl.model.amount).where(accounts_ctrl.model.id == id)
+    )
+    assert stored[0].amount == Decimal("0")
+    assert (await accounts_ctrl.get("id", id)).amount == Decimal("5")
+
+
+async def test_post_takes_a_checkpoint_every_interval(
+    dumb_account, ledger_ctrl, monkeypatch
+):
+    monkeypatch.setattr(settings, "LEDGER_CHECKPOINT_INTERVAL", 3)
+    id = dumb_account.id
+    for _ in range(4):
+        await ledger_ctrl.post(None, [(None, Decimal("-1")), (id, Decimal("1"))])
+
+    checkpoint = await ledger_ctrl.query(select(BalanceCheckpoint))
+    balance = (await ledger_ctrl.balances([id]))[id]
+    assert checkpoint[0].balance == Decimal("3")
+    assert balance.balance == Decimal("4")
+    assert balance.pending == 1
+
+
+@pytest.mark.parametrize(
+    "entries,detail",
+    [
+        ([(1, Decimal("1"))], "the postings must sum to zero."),
+        ([(None, Decimal("-1")), (999, Decimal("1"))], "the account of the posting does not exists."),
+    ],
+)
+async def test_post_fail(dumb_account, ledger_ctrl, entries, detail):
+    with pytest.raises(DatabaseException) as exc:
+        await ledger_ctrl.post(None, entries)
+
+    assert exc.value.detail == detail
+    assert await ledger_ctrl.count() == 0
+
+
+async def test_rebuild_recomputes_the_accounts_amount(
+    dumb_account, ledger_ctrl, accounts_ctrl
+):
+    id = dumb_account.id
+    for value in ("5", "2.5"):
+        await ledger_ctrl.post(None, [(None, -Decimal(value)), (id, Decimal(value))])
+    await ledger_ctrl.query(
+        BalanceCheckpoint.__table__.update().values(balance=Decimal("100"))
+    )
+
+    rebuilt = await ledger_ctrl.rebuild()
+
+    checkpoints = await ledger_ctrl.query(select(BalanceCheckpoint))
+    last_posting = await ledger_ctrl.query(select(func.max(Posting.id)))
+    assert rebuilt == 1
+    assert (await accounts_ctrl.get("id", id)).amount == Decimal("7.5")
+    assert checkpoints[0].balance == Decimal("7.5")
+    assert checkpoints[0].posting_id == last_posting[0][0]
@@ -0,0 +1,63 @@
+import asyncio
+import random
+from decimal import Decimal
+
+from core.exceptions import TransactionException
+from core.transactions.models import TransactionType
+
+TRANSFERS = 1000
+WORKERS = 10
+INITIAL_AMOUNT = Decimal("100")
+
+
+async def test_concurrent_withdraws_do_not_overdraw(
+    dumb_account_10amount, transaction_ctrl, accounts_ctrl
+):
+    account = dumb_account_10amount
+
+    async def withdraw():
+        try:
+            return await transaction_ctrl.new(
+                account, account, Decimal("4"), TransactionType.withdraw, accounts_ctrl
+            )
+        except TransactionException:
+            return False
+
+    results = await asyncio.gather(*(withdraw() for _ in range(5)))
+
+    assert sum(results) == 2
+    assert (await accounts_ctrl.get("id", account.id)).amount == Decimal("2")
+
+
+async def test_concurrent_transfers_conserve_the_money(
+    five_dumb_accounts, transaction_ctrl, accounts_ctrl
+):
+    accounts = await accounts_ctrl.all()
+    for account in accounts:
+        await accounts_ctrl.update_(account.id, amount=INITIAL_AMOUNT)
+    accounts = await accounts_ctrl.all()
+
+    rnd = random.Random(42)
+
+    async def transfer():
+        from_, to = rnd.sample(accounts, 2)
+        value = Decimal(rnd.randint(1, 40))
+        try:
+            return await transaction_ctrl.new(
+                from_, to, value, TransactionType.transference, accounts_ctrl
+            )
+        except TransactionException as exc:
+            assert exc.detail == "Insufficient funds."
+            return False
+
+    async def worker():
+        # each worker task has its own connection, like concurrent requests
+        return [await transfer() for _ in range(TRANSFERS // WORKERS)]
+
+    results = sum(await asyncio.gather(*(worker() for _ in range(WORKERS))), [])
+
+    final = await accounts_ctrl.all()
+    transactions = await transaction_ctrl.count()
+    assert sum(account.amount for account in final) == INITIAL_AMOUNT * len(accounts)
+    assert all(account.amount >= 0 for account in final)
+    assert transactions == sum(results) > 0
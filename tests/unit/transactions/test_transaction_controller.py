@@ -7,6 +7,7 @@ import pytest
 from sqlalchemy import and_, select
 
 from core.transactions.models import TransactionType
+from core.transactions.schemas import TransactionInSchema
 from core.exceptions import TransactionException
 from core.domain_rules import domain_rules
 
@@ -202,3 +203,24 @@ async def test_new_with_invalid_transaction_type(
 
     assert e.value.code == HTTPStatus.UNPROCESSABLE_ENTITY
     assert e.value.detail == "Invalid transaction type."
+
+
+async def test_new_many_validates_the_batch_before_applying(
+    two_dumb_accounts_10amount, transaction_ctrl, accounts_ctrl
+):
+    accounts = {account.id: account for account in await accounts_ctrl.all()}
+    items = [
+        TransactionInSchema(
+            from_account_id=1, to_account_id=2, value=Decimal("5"), type=type
+        )
+        for type in (TransactionType.transference, TransactionType.deposit)
+    ]
+
+    results = await transaction_ctrl.new_many(items, accounts, accounts_ctrl)
+
+    assert [result.detail for result in results] == [
+        "not applied, other item of the batch failed.",
+        "you can only to deposit on your account",
+    ]
+    assert await transaction_ctrl.count() == 0
+    assert (await accounts_ctrl.get("id", 1)).amount == Decimal("10")
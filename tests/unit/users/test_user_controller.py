@@ -77,3 +77,26 @@ async def test_update_with_not_int_id(user_ctrl, dumb_user):
     )
 
     assert not updated
+
+
+async def test_create_many_hashes_passwords(user_ctrl, password_controller):
+    rows = [
+        {
+            'username': f'test{i}',
+            'first_name': 'test',
+            'last_name': 'test',
+            'password': 'Password@01',
+            'cpf': cpf,
+            'birthdate': date(2002, 5, 3),
+        }
+        for i, cpf in enumerate(['953.447.200-09', '910.833.160-01', '27988259032'])
+    ]
+
+    created = await user_ctrl.create_many(rows)
+    users = await user_ctrl.all()
+
+    assert created == 3
+    assert [u.username for u in users] == ['test0', 'test1', 'test2']
+    assert all(
+        password_controller.check_password('Password@01', u.password) for u in users
+    )